@@ -0,0 +1,126 @@
+import asyncio
+import os
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Optional
+from PySide6 import QtCore as qtc
+from mistralai import Mistral
+from .mistral_agent import DEFAULT_MODEL, MISSING_KEY_ERROR, create_client, request_marks
+from ..models.usage import Usage
+from .model_router import LatencyTracker
+
+
+class AsyncMistralBackend(qtc.QObject):
+    """Runs Mistral requests as coroutines on one asyncio loop.
+
+    The loop lives in a single background thread, so in-flight requests cost
+    coroutines rather than one QThread each. Signals carry the request id and
+    are queued back to receivers on the Qt thread.
+    """
+
+    response_received = qtc.Signal(str, str, Usage, dict)
+    error_occurred = qtc.Signal(str, str)
+    finished_signal = qtc.Signal(str)
+
+    def __init__(self, max_concurrency: int = 64,
+                 client_factory: Callable[[str], Mistral] = create_client,
+                 tracker: Optional[LatencyTracker] = None,
+                 parent=None):
+        super().__init__(parent)
+        self.max_concurrency = max_concurrency
+        self.client_factory = client_factory
+        self.tracker = tracker
+        self._client: Optional[Mistral] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._futures: Dict[str, "asyncio.Future"] = {}
+        self._lock = threading.Lock()
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="mistral-asyncio",
+                                        daemon=True)
+        self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._loop.run_forever()
+
+    def submit(self, prompt: str, request_id: Optional[str] = None,
+               model: str = DEFAULT_MODEL) -> str:
+        request_id = request_id or str(uuid.uuid4())
+        future = asyncio.run_coroutine_threadsafe(
+            self._complete(request_id, prompt, model), self._loop)
+        with self._lock:
+            self._futures[request_id] = future
+        future.add_done_callback(lambda _: self._forget(request_id))
+        return request_id
+
+    def _forget(self, request_id: str):
+        with self._lock:
+            self._futures.pop(request_id, None)
+
+    def cancel(self, request_id: str):
+        with self._lock:
+            future = self._futures.get(request_id)
+        if future is not None:
+            future.cancel()
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._futures)
+
+    def _get_client(self, api_key: str) -> Mistral:
+        if self._client is None:
+            self._client = self.client_factory(api_key)
+        return self._client
+
+    def _record(self, model: str, started: float, ok: bool = True):
+        if self.tracker:
+            self.tracker.record(model, time.perf_counter() - started, ok=ok)
+
+    async def _complete(self, request_id: str, prompt: str, model: str):
+        try:
+            async with self._semaphore:
+                api_key = os.environ.get("MISTRAL_API_KEY")
+                if not api_key:
+                    self.error_occurred.emit(request_id, MISSING_KEY_ERROR)
+                    return
+
+                # Each task runs in its own context, so concurrent requests
+                # don't see each other's marks.
+                marks = {"request_started_at": time.time()}
+                request_marks.set(marks)
+                started = time.perf_counter()
+                try:
+                    chat_response = await self._get_client(api_key).chat.complete_async(
+                        model=model,
+                        messages=[{"role": "user", "content": prompt}],
+                    )
+                except Exception:
+                    self._record(model, started, ok=False)
+                    raise
+                marks["completed_at"] = time.time()
+                self._record(model, started)
+
+                self.response_received.emit(
+                    request_id,
+                    chat_response.choices[0].message.content,
+                    Usage.from_response(chat_response, model),
+                    marks
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.error_occurred.emit(request_id, f"An error occurred: {e}")
+        finally:
+            self.finished_signal.emit(request_id)
+
+    def shutdown(self, timeout: float = 5.0):
+        with self._lock:
+            futures = list(self._futures.values())
+        for future in futures:
+            future.cancel()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
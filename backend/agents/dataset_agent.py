@@ -1,26 +1,111 @@
+import hashlib
+import queue
 import sqlite3
+import threading
+import time
 import uuid
 import os
-from typing import Optional
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
 from PySide6 import QtCore as qtc
+from ..config import data_dir
 from ..models.message import Message
 from ..models.profile import Profile
+from ..models.request_timing import RequestTiming
+from ..models.usage import Usage
+from ..storage.codec import ContentCodec, IDENTITY
+from ..storage.journal import MessageJournal
+
+# Open/total connection counts, read by the diagnostics sampler.
+connection_stats = {"open": 0, "opened_total": 0}
+_connection_stats_lock = threading.Lock()
+
+
+class CountedConnection(sqlite3.Connection):
+    """Connection that shows up in connection_stats until it is closed."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._counted = True
+        with _connection_stats_lock:
+            connection_stats["open"] += 1
+            connection_stats["opened_total"] += 1
+
+    def close(self):
+        super().close()
+        with _connection_stats_lock:
+            if self._counted:
+                self._counted = False
+                connection_stats["open"] -= 1
+
+
+def open_connection(db_path: str) -> sqlite3.Connection:
+    """Every connection to the dataset goes through here so it is counted."""
+    conn = sqlite3.connect(db_path, timeout=30, factory=CountedConnection)
+    conn.execute("PRAGMA busy_timeout = 30000")
+    return conn
+
 
 class DatasetAgent:
-    def __init__(self, db_path: Optional[str] = None):
+    def __init__(self, db_path: Optional[str] = None,
+                 codec: Optional[ContentCodec] = None):
         if db_path is None:
-            backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            self.db_path = os.path.join(backend_dir, "chat_dataset.db")
+            self.db_path = os.path.join(data_dir(), "chat_dataset.db")
         else:
             self.db_path = db_path
+
+        self.codec = codec if codec is not None else ContentCodec.from_env()
+        # Called with the committed messages after every write.
+        self.listeners: List[Callable[[List[Message]], None]] = []
             
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
         
         self._init_db()
 
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = open_connection(self.db_path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @property
+    def archive_dir(self) -> str:
+        return os.path.join(os.path.dirname(self.db_path), "archive")
+
+    def archive_path(self, month: str) -> str:
+        return os.path.join(self.archive_dir, f"chat_dataset_{month}.db")
+
+    def archive_paths(self) -> List[str]:
+        if not os.path.isdir(self.archive_dir):
+            return []
+        return sorted(
+            os.path.join(self.archive_dir, name)
+            for name in os.listdir(self.archive_dir)
+            if name.startswith("chat_dataset_") and name.endswith(".db")
+        )
+
+    @staticmethod
+    def content_hash(content: str) -> str:
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
     def _init_db(self):
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
+
+            # Only takes effect on a fresh database; DatasetMaintenance
+            # converts older files. WAL lets the maintenance job read while
+            # the app keeps writing.
+            cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            cursor.execute("PRAGMA journal_mode = WAL")
+
+            # Several agents start at once (writer, profile workers, the
+            # similarity index); take the write lock before checking the
+            # schema so only one of them migrates it.
+            cursor.execute("BEGIN IMMEDIATE")
             
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS profiles (
@@ -41,10 +126,145 @@ class DatasetAgent:
                     FOREIGN KEY(sender_id) REFERENCES profiles(id)
                 )
             """)
+
+            self._add_missing_columns(cursor, "messages", [
+                ("encoding", f"TEXT NOT NULL DEFAULT '{IDENTITY}'"),
+                ("raw_size", "INTEGER"),
+                ("content_hash", "TEXT"),
+                ("model", "TEXT"),
+                ("prompt_tokens", "INTEGER"),
+                ("completion_tokens", "INTEGER"),
+                ("finish_reason", "TEXT"),
+            ])
+
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_messages_conversation
+                ON messages (conversation_id, id)
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_messages_content_hash
+                ON messages (content_hash)
+            """)
+
+            self._init_search_index(cursor)
+            self._init_usage_tables(cursor)
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS request_timings (
+                    exchange_id TEXT PRIMARY KEY,
+                    conversation_id TEXT NOT NULL,
+                    model TEXT,
+                    sent_at REAL NOT NULL,
+                    request_started_at REAL,
+                    first_byte_at REAL,
+                    completed_at REAL,
+                    rendered_at REAL,
+                    prompt_chars INTEGER,
+                    response_chars INTEGER
+                )
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_request_timings_sent_at
+                ON request_timings (sent_at)
+            """)
+            # Highest MessageJournal sequence number already written here.
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS journal_state (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    applied_seq INTEGER NOT NULL
+                )
+            """)
             conn.commit()
 
+    def _add_missing_columns(self, cursor: sqlite3.Cursor, table: str, columns):
+        cursor.execute(f"PRAGMA table_info({table})")
+        existing = {row[1] for row in cursor.fetchall()}
+        for name, definition in columns:
+            if name not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+
+    def _init_search_index(self, cursor: sqlite3.Cursor):
+        # Contentless FTS5 table: it indexes the plain text without storing a
+        # second copy of it, so compressed rows stay searchable.
+        cursor.execute("""
+            SELECT name FROM sqlite_master
+            WHERE type = 'table' AND name = 'messages_fts'
+        """)
+        if cursor.fetchone():
+            return
+
+        cursor.execute("""
+            CREATE VIRTUAL TABLE messages_fts USING fts5(content, content='')
+        """)
+        cursor.execute("SELECT id, content, encoding FROM messages")
+        for message_id, content, encoding in cursor.fetchall():
+            cursor.execute(
+                "INSERT INTO messages_fts (rowid, content) VALUES (?, ?)",
+                (message_id, self.codec.decode(content, encoding)))
+
+    def _init_usage_tables(self, cursor: sqlite3.Cursor):
+        # Running totals kept up to date by triggers, so usage reports are
+        # primary-key lookups instead of scans over messages.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS usage_by_conversation (
+                conversation_id TEXT PRIMARY KEY,
+                responses INTEGER NOT NULL DEFAULT 0,
+                prompt_tokens INTEGER NOT NULL DEFAULT 0,
+                completion_tokens INTEGER NOT NULL DEFAULT 0,
+                last_response_at TIMESTAMP
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_usage_by_conversation_prompt
+            ON usage_by_conversation (prompt_tokens DESC)
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS usage_by_day (
+                day TEXT NOT NULL,
+                model TEXT NOT NULL,
+                responses INTEGER NOT NULL DEFAULT 0,
+                prompt_tokens INTEGER NOT NULL DEFAULT 0,
+                completion_tokens INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, model)
+            )
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_messages_usage
+            AFTER INSERT ON messages
+            WHEN NEW.prompt_tokens IS NOT NULL OR NEW.completion_tokens IS NOT NULL
+            BEGIN
+                INSERT INTO usage_by_conversation
+                    (conversation_id, responses, prompt_tokens, completion_tokens, last_response_at)
+                VALUES (NEW.conversation_id, 1, COALESCE(NEW.prompt_tokens, 0),
+                        COALESCE(NEW.completion_tokens, 0), NEW.created_at)
+                ON CONFLICT(conversation_id) DO UPDATE SET
+                    responses = responses + 1,
+                    prompt_tokens = prompt_tokens + excluded.prompt_tokens,
+                    completion_tokens = completion_tokens + excluded.completion_tokens,
+                    last_response_at = excluded.last_response_at;
+
+                INSERT INTO usage_by_day (day, model, responses, prompt_tokens, completion_tokens)
+                VALUES (date(NEW.created_at), COALESCE(NEW.model, 'unknown'), 1,
+                        COALESCE(NEW.prompt_tokens, 0), COALESCE(NEW.completion_tokens, 0))
+                ON CONFLICT(day, model) DO UPDATE SET
+                    responses = responses + 1,
+                    prompt_tokens = prompt_tokens + excluded.prompt_tokens,
+                    completion_tokens = completion_tokens + excluded.completion_tokens;
+            END
+        """)
+
+    def _row_to_message(self, row) -> Message:
+        message_id, conversation_id, sender_id, content, encoding, created_at = row
+        return Message(
+            id=message_id,
+            conversation_id=conversation_id,
+            sender_id=sender_id,
+            content=self.codec.decode(content, encoding),
+            created_at=created_at
+        )
+
     def get_or_create_profile(self, entity_type: str) -> Profile:
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             cursor.execute("""
@@ -80,14 +300,256 @@ class DatasetAgent:
             conn.commit()
             return profile
 
-    def log_message(self, message: Message):
-        with sqlite3.connect(self.db_path) as conn:
+    @staticmethod
+    def _timestamp(value) -> Optional[str]:
+        # Stored in the same UTC "YYYY-MM-DD HH:MM:SS" form as CURRENT_TIMESTAMP.
+        if value is None or isinstance(value, str):
+            return value
+        return value.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+    def _insert_message(self, cursor: sqlite3.Cursor, message: Message) -> int:
+        content, encoding = self.codec.encode(message.content)
+        usage = message.usage
+        cursor.execute("""
+            INSERT INTO messages (conversation_id, sender_id, content, encoding,
+                                  raw_size, content_hash, model, prompt_tokens,
+                                  completion_tokens, finish_reason, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+        """, (message.conversation_id, message.sender_id, content, encoding,
+              len(message.content.encode("utf-8")), self.content_hash(message.content),
+              message.model,
+              usage.prompt_tokens if usage else None,
+              usage.completion_tokens if usage else None,
+              usage.finish_reason if usage else None,
+              self._timestamp(message.created_at)))
+        message.id = cursor.lastrowid
+        cursor.execute(
+            "INSERT INTO messages_fts (rowid, content) VALUES (?, ?)",
+            (message.id, message.content))
+        return message.id
+
+    def _insert_timing(self, cursor: sqlite3.Cursor, timing: RequestTiming):
+        cursor.execute("""
+            INSERT OR REPLACE INTO request_timings
+                (exchange_id, conversation_id, model, sent_at, request_started_at,
+                 first_byte_at, completed_at, rendered_at, prompt_chars, response_chars)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (timing.exchange_id, timing.conversation_id, timing.model, timing.sent_at,
+              timing.request_started_at, timing.first_byte_at, timing.completed_at,
+              timing.rendered_at, timing.prompt_chars, timing.response_chars))
+
+    def _notify(self, messages: List[Message]):
+        for listener in self.listeners:
+            listener(messages)
+
+    def log_message(self, message: Message) -> int:
+        with self._connect() as conn:
+            self._insert_message(conn.cursor(), message)
+            conn.commit()
+        self._notify([message])
+        return message.id
+
+    def write_batch(self, messages: Iterable[Message] = (),
+                    timings: Iterable[RequestTiming] = (),
+                    journal_seq: Optional[int] = None):
+        messages = list(messages)
+        with self._connect() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO messages (conversation_id, sender_id, content)
-                VALUES (?, ?, ?)
-            """, (message.conversation_id, message.sender_id, message.content))
+            for message in messages:
+                self._insert_message(cursor, message)
+            for timing in timings:
+                self._insert_timing(cursor, timing)
+            if journal_seq is not None:
+                cursor.execute("""
+                    INSERT INTO journal_state (id, applied_seq) VALUES (1, ?)
+                    ON CONFLICT (id) DO UPDATE
+                    SET applied_seq = MAX(applied_seq, excluded.applied_seq)
+                """, (journal_seq,))
             conn.commit()
+        if messages:
+            self._notify(messages)
+
+    def get_journal_seq(self) -> int:
+        with self._connect() as conn:
+            row = conn.execute("SELECT applied_seq FROM journal_state WHERE id = 1").fetchone()
+        return row[0] if row else 0
+
+    def get_request_timings(self, since: float) -> List[dict]:
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute("""
+                SELECT * FROM request_timings
+                WHERE sent_at >= ?
+                ORDER BY sent_at
+            """, (since,)).fetchall()
+            return [dict(row) for row in rows]
+
+    def _archive_groups(self, conn: sqlite3.Connection) -> List[List[str]]:
+        # "main" counts towards SQLITE_LIMIT_ATTACHED, so leave room for it.
+        per_group = max(conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED) - 1, 1)
+        paths = self.archive_paths()
+        return [paths[i:i + per_group] for i in range(0, len(paths), per_group)]
+
+    def _query_with_archives(self, sql: str, params: tuple) -> list:
+        """Run ``sql`` against the hot database and every archive file.
+
+        ``sql`` must use ``{db}`` as the schema prefix for its tables; archives
+        are ATTACHed in groups and the per-schema queries combined with
+        UNION ALL. Rows come back unordered.
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql.format(db="main"), params)
+            rows = cursor.fetchall()
+
+            for group in self._archive_groups(conn):
+                aliases = [f"archive_{i}" for i in range(len(group))]
+                for alias, path in zip(aliases, group):
+                    cursor.execute("ATTACH DATABASE ? AS " + alias, (path,))
+                try:
+                    union = " UNION ALL ".join(
+                        f"SELECT * FROM ({sql.format(db=alias)})" for alias in aliases)
+                    cursor.execute(union, params * len(aliases))
+                    rows.extend(cursor.fetchall())
+                finally:
+                    conn.commit()
+                    for alias in aliases:
+                        cursor.execute("DETACH DATABASE " + alias)
+        return rows
+
+    def get_conversation_messages(self, conversation_id: str,
+                                  include_archives: bool = False) -> List[Message]:
+        sql = """
+            SELECT id, conversation_id, sender_id, content, encoding, created_at
+            FROM {db}.messages
+            WHERE conversation_id = ?
+        """
+        if include_archives:
+            rows = self._query_with_archives(sql, (conversation_id,))
+            rows.sort(key=lambda row: (row[5] or "", row[0]))
+        else:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute(sql.format(db="main") + " ORDER BY id", (conversation_id,))
+                rows = cursor.fetchall()
+        return [self._row_to_message(row) for row in rows]
+
+    def get_messages(self, message_ids: Iterable[int]) -> Dict[int, Message]:
+        message_ids = list(dict.fromkeys(message_ids))
+        if not message_ids:
+            return {}
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT id, conversation_id, sender_id, content, encoding, created_at
+                FROM messages
+                WHERE id IN ({", ".join("?" * len(message_ids))})
+            """, message_ids)
+            rows = cursor.fetchall()
+        return {row[0]: self._row_to_message(row) for row in rows}
+
+    def get_profile_ids(self, entity_type: str) -> List[str]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id FROM profiles WHERE entity_type = ?", (entity_type,)).fetchall()
+        return [row[0] for row in rows]
+
+    def iter_messages(self, batch_size: int = 500, after_id: int = 0) -> Iterator[Message]:
+        last_id = after_id
+        while True:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT id, conversation_id, sender_id, content, encoding, created_at
+                    FROM messages
+                    WHERE id > ?
+                    ORDER BY id
+                    LIMIT ?
+                """, (last_id, batch_size))
+                rows = cursor.fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._row_to_message(row)
+            last_id = rows[-1][0]
+
+    def search_messages(self, query: str, limit: int = 50,
+                        include_archives: bool = False) -> List[Message]:
+        sql = """
+            SELECT m.id, m.conversation_id, m.sender_id, m.content, m.encoding,
+                   m.created_at, f.rank AS rank
+            FROM {db}.messages_fts f
+            JOIN {db}.messages m ON m.id = f.rowid
+            WHERE f.messages_fts MATCH ?
+        """
+        if include_archives:
+            rows = self._query_with_archives(sql, (query,))
+        else:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute(sql.format(db="main") + " ORDER BY rank LIMIT ?", (query, limit))
+                rows = cursor.fetchall()
+        rows.sort(key=lambda row: row[-1])
+        return [self._row_to_message(row[:-1]) for row in rows[:limit]]
+
+    def get_conversation_usage(self, conversation_id: str) -> Optional[dict]:
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("""
+                SELECT conversation_id, responses, prompt_tokens, completion_tokens, last_response_at
+                FROM usage_by_conversation
+                WHERE conversation_id = ?
+            """, (conversation_id,)).fetchone()
+            return dict(row) if row else None
+
+    def get_top_conversations_by_prompt_tokens(self, limit: int = 10) -> List[dict]:
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute("""
+                SELECT conversation_id, responses, prompt_tokens, completion_tokens, last_response_at
+                FROM usage_by_conversation
+                ORDER BY prompt_tokens DESC
+                LIMIT ?
+            """, (limit,)).fetchall()
+            return [dict(row) for row in rows]
+
+    def get_daily_usage(self, days: int = 30) -> List[dict]:
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute("""
+                SELECT day, model, responses, prompt_tokens, completion_tokens
+                FROM usage_by_day
+                WHERE day >= date('now', ?)
+                ORDER BY day DESC, model
+            """, (f"-{days} days",)).fetchall()
+            return [dict(row) for row in rows]
+
+    def storage_stats(self) -> dict:
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT encoding,
+                       COUNT(*),
+                       COALESCE(SUM(COALESCE(raw_size, LENGTH(CAST(content AS BLOB)))), 0),
+                       COALESCE(SUM(LENGTH(CAST(content AS BLOB))), 0)
+                FROM messages
+                GROUP BY encoding
+            """)
+            rows = cursor.fetchall()
+
+        stats = {"messages": 0, "raw_bytes": 0, "stored_bytes": 0, "by_encoding": {}}
+        for encoding, count, raw_bytes, stored_bytes in rows:
+            stats["messages"] += count
+            stats["raw_bytes"] += raw_bytes
+            stats["stored_bytes"] += stored_bytes
+            stats["by_encoding"][encoding] = {
+                "messages": count,
+                "raw_bytes": raw_bytes,
+                "stored_bytes": stored_bytes,
+            }
+        stats["ratio"] = (stats["raw_bytes"] / stats["stored_bytes"]
+                          if stats["stored_bytes"] else 1.0)
+        return stats
 
 class DatasetAgentWorker(qtc.QThread):
     profile_ready = qtc.Signal(Profile)
@@ -115,4 +577,205 @@ class DatasetAgentWorker(qtc.QThread):
         except Exception as e:
             self.error_occurred.emit(f"Dataset error: {str(e)}")
         finally:
-            self.finished_signal.emit()
\ No newline at end of file
+            self.finished_signal.emit()
+
+class DatasetWriter(qtc.QThread):
+    """Single long-lived writer that batches messages and request timings.
+
+    Items queued with log_message()/log_timing() are written in one
+    transaction per flush, at most ``flush_interval`` seconds after arriving.
+    With a journal, each item is appended to it before being queued and the
+    batch commit records the journal position, so anything queued but not
+    yet written when the process dies is replayed on the next start.
+    """
+
+    batch_written = qtc.Signal(int)
+    error_occurred = qtc.Signal(str)
+
+    _STOP = object()
+
+    def __init__(self, db_path: Optional[str] = None, flush_interval: float = 0.25,
+                 max_batch: int = 500, journal: Optional[MessageJournal] = None,
+                 max_retry_delay: float = 30.0, max_attempts: int = 5, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.journal = journal
+        self.max_retry_delay = max_retry_delay
+        self.max_attempts = max_attempts
+        self.listeners: List[Callable[[List[Message]], None]] = []
+        self._queue: "queue.Queue" = queue.Queue()
+        self._stop_requested = threading.Event()
+        if journal is not None:
+            # Items can be logged before run() starts, and their sequence
+            # numbers must land past what the database already applied.
+            journal.start_seq(DatasetAgent(db_path).get_journal_seq())
+
+    def add_listener(self, listener: Callable[[List[Message]], None]):
+        # Runs on the writer thread after each committed batch.
+        self.listeners.append(listener)
+
+    @staticmethod
+    def _journal_record(item) -> dict:
+        if isinstance(item, RequestTiming):
+            return {"kind": "timing", **vars(item)}
+        usage = item.usage
+        return {
+            "kind": "message",
+            "conversation_id": item.conversation_id,
+            "sender_id": item.sender_id,
+            "content": item.content,
+            "created_at": DatasetAgent._timestamp(item.created_at),
+            "model": item.model,
+            "usage": vars(usage) if usage is not None else None,
+        }
+
+    @staticmethod
+    def _from_journal_record(record: dict):
+        record = dict(record)
+        if record.pop("kind") == "timing":
+            return RequestTiming(**record)
+        usage = record.pop("usage")
+        return Message(usage=Usage(**usage) if usage else None, **record)
+
+    def _enqueue(self, item):
+        seq = self.journal.append(self._journal_record(item)) if self.journal else None
+        self._queue.put((seq, item))
+
+    def log_message(self, message: Message):
+        self._enqueue(message)
+
+    def log_timing(self, timing: RequestTiming):
+        self._enqueue(timing)
+
+    def stop(self, timeout_ms: int = 10000):
+        self._stop_requested.set()
+        self._queue.put(self._STOP)
+        self.wait(timeout_ms)
+        if self.journal is not None and not self.isRunning():
+            self.journal.close()
+
+    def _write(self, agent: DatasetAgent, batch: list) -> bool:
+        messages = [item for _, item in batch if isinstance(item, Message)]
+        timings = [item for _, item in batch if isinstance(item, RequestTiming)]
+        seqs = [seq for seq, _ in batch if seq is not None]
+        journal_seq = max(seqs) if seqs else None
+        try:
+            agent.write_batch(messages, timings, journal_seq)
+        except Exception as e:
+            self.error_occurred.emit(f"Dataset error: {str(e)}")
+            return False
+        self.batch_written.emit(len(batch))
+        if self.journal is not None and journal_seq is not None and self._queue.empty():
+            self.journal.compact(journal_seq)
+        return True
+
+    def replay_journal(self, agent: DatasetAgent) -> list:
+        """Write what the previous run journaled but never committed.
+
+        Returns the (seq, item) pairs that still could not be written.
+        """
+        pending = []
+        for seq, record in self.journal.pending(agent.get_journal_seq()):
+            try:
+                pending.append((seq, self._from_journal_record(record)))
+            except (KeyError, TypeError, ValueError) as e:
+                # Written by a version whose Message/Usage/RequestTiming
+                # fields differ; one stale record must not stop the writer.
+                self._reject(seq, record, f"unreadable journal record: {e}")
+        for i in range(0, len(pending), self.max_batch):
+            if not self._write(agent, pending[i:i + self.max_batch]):
+                return pending[i:]
+        if pending:
+            print(f"Replayed {len(pending)} journaled items")
+        return []
+
+    def _reject(self, seq: Optional[int], record: dict, reason: str):
+        self.error_occurred.emit(f"Dataset error: skipped item {seq}: {reason}")
+        if self.journal is not None:
+            self.journal.reject(seq, record, reason)
+
+    def _write_each(self, agent: DatasetAgent, batch: list) -> list:
+        """Write a batch that keeps failing one item at a time.
+
+        Items the database itself rejects are set aside (and applied_seq is
+        moved past them) so they stop blocking the items behind them. Returns
+        the items from the first other failure on, e.g. a locked database,
+        which are retried.
+        """
+        for i, (seq, item) in enumerate(batch):
+            try:
+                agent.write_batch(
+                    [item] if isinstance(item, Message) else [],
+                    [item] if isinstance(item, RequestTiming) else [],
+                    seq)
+            except (sqlite3.IntegrityError, sqlite3.DataError, sqlite3.InterfaceError,
+                    sqlite3.ProgrammingError, TypeError, ValueError) as e:
+                self._reject(seq, self._journal_record(item), str(e))
+                try:
+                    agent.write_batch(journal_seq=seq)
+                except Exception as e:
+                    self.error_occurred.emit(f"Dataset error: {str(e)}")
+                    return batch[i + 1:]
+            except Exception as e:
+                self.error_occurred.emit(f"Dataset error: {str(e)}")
+                return batch[i:]
+            else:
+                self.batch_written.emit(1)
+        return []
+
+    def run(self):
+        try:
+            agent = DatasetAgent(self.db_path)
+        except Exception as e:
+            self.error_occurred.emit(f"Dataset error: {str(e)}")
+            return
+        agent.listeners = self.listeners
+
+        # A failed batch is retried on its own, at most max_batch items at a
+        # time and with growing pauses, while new items wait in the queue
+        # behind it, so applied_seq never moves past it. If it still fails
+        # once stop() is called, it and everything queued after it are left
+        # to the journal for the next start. After max_attempts failures
+        # the batch is written item by item so a record the database rejects
+        # is set aside instead of blocking the writer for good.
+        retry = self.replay_journal(agent) if self.journal is not None else []
+        failures = 0
+        stopping = False
+        while retry or not (stopping and self._queue.empty()):
+            if retry:
+                batch, retry = retry[:self.max_batch], retry[self.max_batch:]
+            else:
+                batch = []
+                item = self._queue.get()
+                deadline = time.monotonic() + self.flush_interval
+                while True:
+                    if item is self._STOP:
+                        stopping = True
+                    else:
+                        batch.append(item)
+                    if len(batch) >= self.max_batch:
+                        break
+                    try:
+                        if stopping:
+                            item = self._queue.get_nowait()
+                        else:
+                            item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                    except queue.Empty:
+                        break
+                if not batch:
+                    continue
+            if failures >= self.max_attempts:
+                batch = self._write_each(agent, batch)
+                if not batch:
+                    failures = 0
+                    continue
+            elif self._write(agent, batch):
+                failures = 0
+                continue
+            retry = batch + retry
+            failures += 1
+            delay = min(self.flush_interval * 2 ** failures, self.max_retry_delay)
+            if self._stop_requested.wait(delay):
+                break
@@ -1,35 +1,118 @@
+import contextvars
 import os
+import threading
+import time
+from typing import Dict, Optional
+import httpx
 from PySide6 import QtCore as qtc
 from mistralai import Mistral
+from ..config import env_str
+from ..models.usage import Usage
+from .model_router import LatencyTracker
+
+DEFAULT_MODEL = "mistral-large-latest"
+MISSING_KEY_ERROR = "Error: MISTRAL_API_KEY not found in environment variables."
+
+
+# Timestamps for the request currently running in this thread / asyncio task.
+# The httpx response hooks below fill in first_byte_at, which the SDK does not
+# expose: httpx calls them once the status line and headers have arrived.
+request_marks: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar(
+    "request_marks", default=None)
+
+
+def _mark_first_byte(response: httpx.Response):
+    marks = request_marks.get()
+    if marks is not None and marks.get("first_byte_at") is None:
+        marks["first_byte_at"] = time.time()
+
+
+async def _mark_first_byte_async(response: httpx.Response):
+    _mark_first_byte(response)
+
+
+def create_client(api_key: Optional[str] = None) -> Mistral:
+    # MISTRAL_SERVER_URL points the SDK at a proxy or a local stub server.
+    return Mistral(
+        api_key=api_key or os.environ.get("MISTRAL_API_KEY"),
+        server_url=env_str("MISTRAL_SERVER_URL"),
+        client=httpx.Client(event_hooks={"response": [_mark_first_byte]}),
+        async_client=httpx.AsyncClient(event_hooks={"response": [_mark_first_byte_async]}),
+    )
+
+
+# Thread workers share one client per API key, so every request reuses the
+# same hooked httpx connection pool instead of opening a new one.
+_shared_clients: Dict[str, Mistral] = {}
+_shared_clients_lock = threading.Lock()
+
+
+def shared_client(api_key: str) -> Mistral:
+    with _shared_clients_lock:
+        client = _shared_clients.get(api_key)
+        if client is None:
+            client = _shared_clients[api_key] = create_client(api_key)
+        return client
+
+
+def close_shared_clients():
+    """Close the workers' connection pools; call once no worker is running."""
+    with _shared_clients_lock:
+        clients = list(_shared_clients.values())
+        _shared_clients.clear()
+    for client in clients:
+        # Only the sync transport is used by workers; the async one never
+        # opened a connection.
+        client.sdk_configuration.client.close()
+
 
 class MistralWorker(qtc.QThread):
-    response_received = qtc.Signal(str)
+    response_received = qtc.Signal(str, Usage, dict)
     error_occurred = qtc.Signal(str)
     finished_signal = qtc.Signal()
 
-    def __init__(self, prompt: str, parent=None):
+    def __init__(self, prompt: str, model: str = DEFAULT_MODEL,
+                 tracker: Optional[LatencyTracker] = None, parent=None):
         super().__init__(parent)
         self.prompt = prompt
+        self.model = model
+        self.tracker = tracker
 
     def run(self):
         try:
             api_key = os.environ.get("MISTRAL_API_KEY")
             
             if not api_key:
-                self.error_occurred.emit("Error: MISTRAL_API_KEY not found in environment variables.")
+                self.error_occurred.emit(MISSING_KEY_ERROR)
                 return
 
-            model = "mistral-large-latest"
-            client = Mistral(api_key=api_key)
+            model = self.model
+            client = shared_client(api_key)
 
             messages = [{"role": "user", "content": self.prompt}]
 
-            chat_response = client.chat.complete(
-                model=model,
-                messages=messages,
+            marks = {"request_started_at": time.time()}
+            request_marks.set(marks)
+            started = time.perf_counter()
+            try:
+                chat_response = client.chat.complete(
+                    model=model,
+                    messages=messages,
+                )
+            except Exception:
+                if self.tracker:
+                    self.tracker.record(model, time.perf_counter() - started, ok=False)
+                raise
+            marks["completed_at"] = time.time()
+            if self.tracker:
+                self.tracker.record(model, time.perf_counter() - started)
+
+            self.response_received.emit(
+                chat_response.choices[0].message.content,
+                Usage.from_response(chat_response, model),
+                marks
             )
-            self.response_received.emit(chat_response.choices[0].message.content)
         except Exception as e:
             self.error_occurred.emit(f"An error occurred: {e}")
         finally:
-            self.finished_signal.emit()
\ No newline at end of file
+            self.finished_signal.emit()
@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+from ..config import env_float, env_int, env_str
+
+SMALL_MODEL = "mistral-small-latest"
+LARGE_MODEL = "mistral-large-latest"
+
+
+class RoutingContext:
+    def __init__(self, prompt: str, attachments: Sequence[str] = (), depth: int = 0,
+                 user_choice: Optional[str] = None):
+        self.prompt = prompt
+        self.attachments = list(attachments)
+        self.depth = depth
+        self.user_choice = user_choice
+
+
+class RoutingRule:
+    def __init__(self, name: str, model: str, matches: Callable[[RoutingContext], bool]):
+        self.name = name
+        self.model = model
+        self.matches = matches
+
+
+class LatencyTracker:
+    """Rolling window of request latencies and failures per model.
+
+    Samples older than ``max_age`` seconds are ignored, so a model that was
+    routed around gets a clean slate once its bad samples age out.
+    """
+
+    def __init__(self, window: int = 50, max_age: float = 300.0):
+        self.window = window
+        self.max_age = max_age
+        self._samples: Dict[str, Deque[Tuple[float, float, bool]]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, model: str, seconds: float, ok: bool = True):
+        with self._lock:
+            samples = self._samples.setdefault(model, deque(maxlen=self.window))
+            samples.append((time.monotonic(), seconds, ok))
+
+    def stats(self, model: str) -> dict:
+        horizon = time.monotonic() - self.max_age
+        with self._lock:
+            samples = [(seconds, ok) for recorded, seconds, ok in self._samples.get(model, ())
+                       if recorded >= horizon]
+        if not samples:
+            return {"samples": 0, "p50": None, "p95": None, "error_rate": 0.0}
+
+        latencies = sorted(seconds for seconds, ok in samples if ok)
+        errors = sum(1 for _, ok in samples if not ok)
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return latencies[min(int(p * len(latencies)), len(latencies) - 1)]
+
+        return {
+            "samples": len(samples),
+            "p50": percentile(0.50),
+            "p95": percentile(0.95),
+            "error_rate": errors / len(samples),
+        }
+
+
+class ModelRouter:
+    """Picks a model per prompt from ordered rules, then steers away from
+    models whose recent p95 latency or error rate is over budget."""
+
+    def __init__(self, rules: List[RoutingRule], default_model: str = LARGE_MODEL,
+                 fallbacks: Optional[Dict[str, str]] = None,
+                 tracker: Optional[LatencyTracker] = None,
+                 max_p95_seconds: float = 20.0, max_error_rate: float = 0.5,
+                 min_samples: int = 5):
+        self.rules = rules
+        self.default_model = default_model
+        self.fallbacks = fallbacks or {}
+        self.tracker = tracker or LatencyTracker()
+        self.max_p95_seconds = max_p95_seconds
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        small = env_str("MYCHATBOT_SMALL_MODEL", SMALL_MODEL)
+        large = env_str("MYCHATBOT_LARGE_MODEL", LARGE_MODEL)
+        short_prompt = env_int("MYCHATBOT_SHORT_PROMPT_CHARS", 280)
+        deep_turns = env_int("MYCHATBOT_DEEP_CONVERSATION_TURNS", 6)
+
+        rules = [
+            RoutingRule("attachments", large, lambda ctx: bool(ctx.attachments)),
+            RoutingRule("deep-conversation", large, lambda ctx: ctx.depth >= deep_turns),
+            RoutingRule("short-prompt", small, lambda ctx: len(ctx.prompt) <= short_prompt),
+        ]
+        return cls(
+            rules,
+            default_model=large,
+            fallbacks={large: small, small: large},
+            max_p95_seconds=env_float("MYCHATBOT_MAX_P95_SECONDS", 20.0),
+            max_error_rate=env_float("MYCHATBOT_MAX_ERROR_RATE", 0.5),
+        )
+
+    def is_degraded(self, model: str) -> bool:
+        stats = self.tracker.stats(model)
+        if stats["samples"] < self.min_samples:
+            return False
+        if stats["error_rate"] > self.max_error_rate:
+            return True
+        return stats["p95"] is not None and stats["p95"] > self.max_p95_seconds
+
+    def choose(self, context: RoutingContext) -> str:
+        if context.user_choice:
+            return context.user_choice
+
+        model = self.default_model
+        for rule in self.rules:
+            if rule.matches(context):
+                model = rule.model
+                break
+
+        fallback = self.fallbacks.get(model)
+        if fallback and self.is_degraded(model) and not self.is_degraded(fallback):
+            return fallback
+        return model
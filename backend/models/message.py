@@ -1,11 +1,15 @@
 from datetime import datetime
 from typing import Optional
+from .usage import Usage
 
 class Message:
     def __init__(self, conversation_id: str, sender_id: str, content: str, 
-                 created_at: Optional[datetime] = None, id: Optional[int] = None):
+                 created_at: Optional[datetime] = None, id: Optional[int] = None,
+                 usage: Optional[Usage] = None, model: Optional[str] = None):
         self.id = id
         self.conversation_id = conversation_id
         self.sender_id = sender_id
         self.content = content
-        self.created_at = created_at if created_at else datetime.now()
\ No newline at end of file
+        self.created_at = created_at if created_at else datetime.now()
+        self.usage = usage
+        self.model = model if model else (usage.model if usage else None)
\ No newline at end of file
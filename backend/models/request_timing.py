@@ -0,0 +1,27 @@
+import time
+from typing import Optional
+
+class RequestTiming:
+    def __init__(self, exchange_id: str, conversation_id: str,
+                 model: Optional[str] = None, sent_at: Optional[float] = None,
+                 request_started_at: Optional[float] = None,
+                 first_byte_at: Optional[float] = None,
+                 completed_at: Optional[float] = None,
+                 rendered_at: Optional[float] = None,
+                 prompt_chars: int = 0, response_chars: int = 0):
+        # All timestamps are seconds since the epoch (time.time()).
+        self.exchange_id = exchange_id
+        self.conversation_id = conversation_id
+        self.model = model
+        self.sent_at = sent_at if sent_at else time.time()
+        self.request_started_at = request_started_at
+        self.first_byte_at = first_byte_at
+        self.completed_at = completed_at
+        self.rendered_at = rendered_at
+        self.prompt_chars = prompt_chars
+        self.response_chars = response_chars
+
+    def update(self, marks: dict):
+        for name in ("request_started_at", "first_byte_at", "completed_at"):
+            if marks.get(name) is not None:
+                setattr(self, name, marks[name])
@@ -0,0 +1,26 @@
+from typing import Optional
+
+class Usage:
+    def __init__(self, model: str, prompt_tokens: Optional[int] = None,
+                 completion_tokens: Optional[int] = None,
+                 finish_reason: Optional[str] = None):
+        self.model = model
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.finish_reason = finish_reason
+
+    @classmethod
+    def from_response(cls, chat_response, model: str) -> "Usage":
+        usage = getattr(chat_response, "usage", None)
+        choices = getattr(chat_response, "choices", None) or []
+        finish_reason = getattr(choices[0], "finish_reason", None) if choices else None
+        return cls(
+            model=getattr(chat_response, "model", None) or model,
+            prompt_tokens=getattr(usage, "prompt_tokens", None),
+            completion_tokens=getattr(usage, "completion_tokens", None),
+            finish_reason=str(finish_reason) if finish_reason is not None else None
+        )
+
+    @property
+    def total_tokens(self) -> int:
+        return (self.prompt_tokens or 0) + (self.completion_tokens or 0)
@@ -0,0 +1,113 @@
+import bz2
+import lzma
+import zlib
+from typing import Dict, Optional, Tuple, Union
+from ..config import env_int, env_str
+
+IDENTITY = "identity"
+
+
+class Compressor:
+    name = IDENTITY
+
+    def compress(self, data: bytes) -> bytes:
+        return data
+
+    def decompress(self, data: bytes) -> bytes:
+        return data
+
+
+class ZlibCompressor(Compressor):
+    name = "zlib"
+
+    def __init__(self, level: int = 6):
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+
+class LzmaCompressor(Compressor):
+    name = "lzma"
+
+    def compress(self, data: bytes) -> bytes:
+        return lzma.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return lzma.decompress(data)
+
+
+class Bz2Compressor(Compressor):
+    name = "bz2"
+
+    def compress(self, data: bytes) -> bytes:
+        return bz2.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return bz2.decompress(data)
+
+
+COMPRESSORS = {
+    IDENTITY: Compressor,
+    ZlibCompressor.name: ZlibCompressor,
+    LzmaCompressor.name: LzmaCompressor,
+    Bz2Compressor.name: Bz2Compressor,
+}
+
+DEFAULT_THRESHOLD = 2048
+
+
+class ContentCodec:
+    """Compresses message bodies above ``threshold`` bytes on write.
+
+    The encoding name is stored next to the content so rows written with any
+    registered compressor can still be decoded after the configuration changes.
+    """
+
+    def __init__(self, compressor: Optional[Compressor] = None,
+                 threshold: int = DEFAULT_THRESHOLD):
+        self.compressor = compressor or ZlibCompressor()
+        self.threshold = threshold
+        self._decoders: Dict[str, Compressor] = {
+            name: factory() for name, factory in COMPRESSORS.items()
+        }
+        self.register(self.compressor)
+
+    @classmethod
+    def from_env(cls) -> "ContentCodec":
+        threshold = env_int("MYCHATBOT_COMPRESS_THRESHOLD", DEFAULT_THRESHOLD)
+        name = env_str("MYCHATBOT_COMPRESS_CODEC", ZlibCompressor.name)
+        factory = COMPRESSORS.get(name, ZlibCompressor)
+        return cls(compressor=factory(), threshold=threshold)
+
+    def register(self, compressor: Compressor):
+        self._decoders[compressor.name] = compressor
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0 and self.compressor.name != IDENTITY
+
+    def encode(self, text: str) -> Tuple[Union[str, bytes], str]:
+        if not self.enabled:
+            return text, IDENTITY
+
+        raw = text.encode("utf-8")
+        if len(raw) < self.threshold:
+            return text, IDENTITY
+
+        packed = self.compressor.compress(raw)
+        if len(packed) >= len(raw):
+            return text, IDENTITY
+        return packed, self.compressor.name
+
+    def decode(self, value: Union[str, bytes], encoding: Optional[str]) -> str:
+        if encoding is None or encoding == IDENTITY:
+            return value if isinstance(value, str) else bytes(value).decode("utf-8")
+
+        decoder = self._decoders.get(encoding)
+        if decoder is None:
+            raise ValueError(f"Unknown content encoding: {encoding}")
+        return decoder.decompress(bytes(value)).decode("utf-8")
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Bulk import of chat logs from other tools and older installs.
+
+    python -m backend.storage.importer exports/*.jsonl conversations.json
+
+Files are cut into chunks (JSONL at line boundaries; JSON and CSV files are one
+chunk each) and parsed, hashed and compressed in a process pool. The main
+process is the only writer: one transaction per chunk, in file order, with the
+chunk's import_progress row committed in the same transaction, so an
+interrupted import resumes at the first unfinished chunk. Messages that were
+already in the database before the import started (same conversation, sender
+and content hash) are skipped, once per copy found, so turns that repeat
+within a conversation ("yes", "continue") are still imported.
+
+Supported shapes:
+  * one message per JSONL line / CSV row / JSON list item, with role|sender|
+    author, content|text|message and optional conversation_id, created_at and
+    model fields
+  * one conversation per JSONL line or JSON list item: {"id": ..., "messages": [...]}
+  * ChatGPT ``conversations.json`` exports (``mapping`` trees)
+"""
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import time
+import uuid
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, List, Optional, Tuple
+from ..agents.dataset_agent import DatasetAgent, open_connection
+from .codec import ContentCodec
+
+FORMATS = ("jsonl", "json", "csv")
+DEFAULT_CHUNK_BYTES = 4 * 1024 * 1024
+
+ROLES = {
+    "user": "user", "human": "user", "you": "user",
+    "assistant": "ai", "ai": "ai", "bot": "ai", "model": "ai", "gpt": "ai",
+    "mistral": "ai", "chatgpt": "ai",
+}
+CONVERSATION_KEYS = ("conversation_id", "conversation", "thread_id", "chat_id", "id")
+ROLE_KEYS = ("role", "sender", "author", "from", "speaker")
+CONTENT_KEYS = ("content", "text", "message", "body", "value")
+TIME_KEYS = ("created_at", "timestamp", "create_time", "time", "date")
+
+# (conversation_id, entity_type, stored content, encoding, raw_size,
+#  content_hash, model, created_at, plain content for the search index)
+Row = tuple
+
+
+class ImportTask:
+    def __init__(self, path: str, fmt: str, start: int, end: int):
+        self.path = path
+        self.fmt = fmt
+        self.start = start
+        self.end = end
+
+    @property
+    def source(self) -> str:
+        # Size is part of the key: a file that grew is re-read (and its old
+        # rows skipped by hash) rather than trusted by offset.
+        return f"{os.path.abspath(self.path)}:{os.path.getsize(self.path)}"
+
+
+def detect_format(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if extension == ".csv":
+        return "csv"
+    return "json"
+
+
+def _first(record: dict, keys) -> Optional[object]:
+    for key in keys:
+        value = record.get(key)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _text(value) -> str:
+    # Plain strings, OpenAI-style content parts and ChatGPT {"parts": [...]}.
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        if "parts" in value:
+            return _text(value["parts"])
+        return _text(value.get("text") or value.get("content"))
+    if isinstance(value, list):
+        return "\n".join(part for part in (_text(item) for item in value) if part)
+    return str(value)
+
+
+def _role(value) -> Optional[str]:
+    if isinstance(value, dict):
+        value = value.get("role") or value.get("name")
+    if value is None:
+        return None
+    return ROLES.get(str(value).strip().lower())
+
+
+def _timestamp(value) -> Optional[str]:
+    if value in (None, ""):
+        return None
+    try:
+        if isinstance(value, (int, float)) or str(value).replace(".", "", 1).isdigit():
+            moment = datetime.fromtimestamp(float(value), tz=timezone.utc)
+        else:
+            moment = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+            if moment.tzinfo is None:
+                moment = moment.replace(tzinfo=timezone.utc)
+    except (ValueError, OverflowError, OSError):
+        return None
+    return DatasetAgent._timestamp(moment)
+
+
+def _conversation_id(value, fallback: str) -> str:
+    return str(value) if value not in (None, "") else str(uuid.uuid5(uuid.NAMESPACE_URL, fallback))
+
+
+def _chatgpt_messages(record: dict) -> Iterator[dict]:
+    nodes = [node.get("message") for node in record.get("mapping", {}).values()]
+    nodes = [node for node in nodes if node]
+    nodes.sort(key=lambda node: node.get("create_time") or 0)
+    for node in nodes:
+        yield {
+            "role": node.get("author"),
+            "content": node.get("content"),
+            "created_at": node.get("create_time"),
+            "model": (node.get("metadata") or {}).get("model_slug"),
+        }
+
+
+def _records(item, fallback_conversation: str,
+             file_key: str) -> Iterator[Tuple[str, dict]]:
+    """Flatten one parsed item (message, conversation or export) into messages.
+
+    Conversations without an id get a stable uuid5 from their position in the
+    file, so re-importing the same file maps onto the same conversation.
+    """
+    if isinstance(item, list):
+        for index, child in enumerate(item):
+            yield from _records(child, f"{fallback_conversation}#{index}", file_key)
+        return
+    if not isinstance(item, dict):
+        return
+
+    if "mapping" in item:
+        conversation = _conversation_id(
+            item.get("conversation_id") or item.get("id"), fallback_conversation)
+        for message in _chatgpt_messages(item):
+            yield conversation, message
+    elif isinstance(item.get("messages"), list):
+        conversation = _conversation_id(_first(item, CONVERSATION_KEYS), fallback_conversation)
+        for message in item["messages"]:
+            if isinstance(message, dict):
+                yield conversation, message
+    elif isinstance(item.get("conversations"), list):
+        yield from _records(item["conversations"], fallback_conversation, file_key)
+    else:
+        # A bare "id" on a message is the message's own id, not its thread's;
+        # loose messages without a conversation all belong to their file.
+        conversation = _first(item, CONVERSATION_KEYS[:-1])
+        yield _conversation_id(conversation, file_key), item
+
+
+def _read_items(task: ImportTask) -> Iterator[Tuple[object, str]]:
+    name = os.path.basename(task.path)
+    if task.fmt == "jsonl":
+        with open(task.path, "rb") as handle:
+            if task.start > 0:
+                # Skip the line that straddles the boundary; the previous
+                # chunk owns it.
+                handle.seek(task.start - 1)
+                handle.readline()
+            while handle.tell() < task.end:
+                offset = handle.tell()
+                line = handle.readline()
+                if not line:
+                    break
+                line = line.strip()
+                if line:
+                    yield json.loads(line), f"{name}@{offset}"
+    elif task.fmt == "csv":
+        with open(task.path, newline="", encoding="utf-8") as handle:
+            for number, row in enumerate(csv.DictReader(handle)):
+                yield row, f"{name}#{number}"
+    else:
+        with open(task.path, encoding="utf-8") as handle:
+            yield json.load(handle), name
+
+
+def parse_chunk(task: ImportTask, codec: ContentCodec) -> Tuple[ImportTask, List[Row], int]:
+    """Runs in a worker process: parse, normalise, hash and compress one chunk."""
+    rows = []
+    dropped = 0
+    file_key = os.path.basename(task.path)
+    for item, fallback in _read_items(task):
+        for conversation_id, record in _records(item, fallback, file_key):
+            entity_type = _role(_first(record, ROLE_KEYS))
+            content = _text(_first(record, CONTENT_KEYS))
+            if entity_type is None or not content.strip():
+                dropped += 1  # system/tool messages, empty nodes
+                continue
+            stored, encoding = codec.encode(content)
+            rows.append((
+                conversation_id, entity_type, stored, encoding,
+                len(content.encode("utf-8")), DatasetAgent.content_hash(content),
+                record.get("model"), _timestamp(_first(record, TIME_KEYS)), content,
+            ))
+    return task, rows, dropped
+
+
+class BulkImporter:
+    def __init__(self, agent: DatasetAgent, workers: Optional[int] = None,
+                 chunk_bytes: int = DEFAULT_CHUNK_BYTES, log=print):
+        self.agent = agent
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_bytes = chunk_bytes
+        self.log = log
+        # Rows up to this id predate the running import; only they count as
+        # "already present".
+        self._baseline_id = 0
+        # Pre-existing copies of each key already matched by an imported row.
+        self._matched: Counter = Counter()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = open_connection(self.agent.db_path)
+        conn.execute("PRAGMA cache_size = -65536")
+        return conn
+
+    def _init_progress(self, conn: sqlite3.Connection):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS import_progress (
+                source TEXT NOT NULL,
+                chunk_start INTEGER NOT NULL,
+                chunk_end INTEGER NOT NULL,
+                imported INTEGER NOT NULL,
+                skipped INTEGER NOT NULL,
+                finished_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (source, chunk_start)
+            )
+        """)
+        conn.commit()
+
+    def plan(self, paths: Iterable[str], fmt: Optional[str] = None) -> List[ImportTask]:
+        tasks = []
+        for path in paths:
+            file_format = fmt or detect_format(path)
+            size = os.path.getsize(path)
+            if file_format != "jsonl":
+                tasks.append(ImportTask(path, file_format, 0, size))
+                continue
+            for start in range(0, max(size, 1), self.chunk_bytes):
+                tasks.append(ImportTask(path, file_format, start, min(start + self.chunk_bytes, size)))
+        return tasks
+
+    def _pending(self, conn: sqlite3.Connection, tasks: List[ImportTask]) -> List[ImportTask]:
+        done = set(conn.execute("SELECT source, chunk_start FROM import_progress"))
+        return [task for task in tasks if (task.source, task.start) not in done]
+
+    def _existing(self, cursor: sqlite3.Cursor, rows: List[Row]) -> Counter:
+        hashes = list({row[5] for row in rows})
+        existing = Counter()
+        for i in range(0, len(hashes), 500):
+            part = hashes[i:i + 500]
+            cursor.execute(f"""
+                SELECT conversation_id, sender_id, content_hash FROM messages
+                WHERE content_hash IN ({", ".join("?" * len(part))})
+                  AND id <= ?
+            """, part + [self._baseline_id])
+            existing.update(cursor.fetchall())
+        return existing
+
+    def _write_chunk(self, conn: sqlite3.Connection, task: ImportTask, rows: List[Row],
+                     senders: dict) -> Tuple[int, int]:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        existing = self._existing(cursor, rows)
+        imported = 0
+        skipped = 0
+        for (conversation_id, entity_type, stored, encoding, raw_size, content_hash,
+             model, created_at, content) in rows:
+            key = (conversation_id, senders[entity_type], content_hash)
+            if self._matched[key] < existing[key]:
+                self._matched[key] += 1
+                skipped += 1
+                continue
+            cursor.execute("""
+                INSERT INTO messages (conversation_id, sender_id, content, encoding,
+                                      raw_size, content_hash, model, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+            """, (conversation_id, senders[entity_type], stored, encoding, raw_size,
+                  content_hash, model, created_at))
+            cursor.execute(
+                "INSERT INTO messages_fts (rowid, content) VALUES (?, ?)",
+                (cursor.lastrowid, content))
+            imported += 1
+        cursor.execute("""
+            INSERT OR REPLACE INTO import_progress
+                (source, chunk_start, chunk_end, imported, skipped)
+            VALUES (?, ?, ?, ?, ?)
+        """, (task.source, task.start, task.end, imported, skipped))
+        conn.commit()
+        return imported, skipped
+
+    def run(self, paths: Iterable[str], fmt: Optional[str] = None) -> dict:
+        started = time.perf_counter()
+        conn = self._connect()
+        conn.isolation_level = None  # explicit BEGIN/COMMIT per chunk
+        self._init_progress(conn)
+
+        tasks = self.plan(paths, fmt)
+        pending = self._pending(conn, tasks)
+        stats = {"chunks": len(tasks), "resumed_chunks": len(tasks) - len(pending),
+                 "imported": 0, "duplicates": 0, "dropped": 0}
+        if not pending:
+            conn.close()
+            self.log("Nothing to import")
+            return stats
+
+        # Same semantics as the app: one profile per entity type, most
+        # recently used first, created on demand.
+        senders = {entity_type: self.agent.get_or_create_profile(entity_type).id
+                   for entity_type in ("user", "ai")}
+
+        self._baseline_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM messages").fetchone()[0]
+        self._matched = Counter()
+
+        # Rebuilt once at the end instead of being maintained row by row.
+        conn.execute("DROP INDEX IF EXISTS idx_messages_conversation")
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                queue = deque()
+                remaining = iter(pending)
+                # Keep a bounded number of parsed chunks ahead of the writer
+                # and write them in file order.
+                for task in remaining:
+                    queue.append(pool.submit(parse_chunk, task, self.agent.codec))
+                    if len(queue) >= self.workers * 2:
+                        break
+                while queue:
+                    task, rows, dropped = queue.popleft().result()
+                    next_task = next(remaining, None)
+                    if next_task is not None:
+                        queue.append(pool.submit(parse_chunk, next_task, self.agent.codec))
+
+                    imported, duplicates = self._write_chunk(conn, task, rows, senders)
+                    stats["imported"] += imported
+                    stats["duplicates"] += duplicates
+                    stats["dropped"] += dropped
+                    self.log(f"{task.path} [{task.start}:{task.end}] "
+                             f"+{imported} messages, {duplicates} duplicates")
+        finally:
+            conn.close()
+            # Schema setup recreates the conversation index.
+            DatasetAgent(self.agent.db_path, self.agent.codec)
+
+        elapsed = time.perf_counter() - started
+        stats["seconds"] = round(elapsed, 2)
+        stats["messages_per_minute"] = round(stats["imported"] / elapsed * 60) if elapsed else 0
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import chat logs into the chat dataset")
+    parser.add_argument("paths", nargs="+", help="JSONL, JSON or CSV chat exports")
+    parser.add_argument("--db", help="Path to chat_dataset.db (defaults to the app database)")
+    parser.add_argument("--format", choices=FORMATS,
+                        help="Input format (default: from the file extension)")
+    parser.add_argument("--workers", type=int, help="Parser processes (default: CPU count)")
+    parser.add_argument("--chunk-mb", type=float, default=DEFAULT_CHUNK_BYTES / (1024 * 1024),
+                        help="JSONL chunk size; one transaction per chunk")
+    args = parser.parse_args()
+
+    importer = BulkImporter(DatasetAgent(args.db), workers=args.workers,
+                            chunk_bytes=int(args.chunk_mb * 1024 * 1024))
+    stats = importer.run(args.paths, args.format)
+    print(", ".join(f"{key}={value}" for key, value in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Append-only journal for messages and request timings that have not reached
+SQLite yet.
+
+DatasetWriter appends every item here before queueing it, and records the
+last applied sequence number in ``journal_state`` in the same transaction as
+each batch. On the next start, records past that number are replayed, so a
+crash or a killed writer thread loses at most the durability window:
+
+* ``always``   - fsync after every record (slowest appends, nothing lost)
+* ``interval`` - fsync at most every ``interval_ms`` from a background thread
+* ``never``    - leave flushing to the OS; survives a process crash, not a
+                 power cut
+
+Each record is framed as ``<length:u32><crc32:u32><json>``; replay stops at the
+first torn or corrupt frame. Records that can be read but never written (an
+older format, or rows the database rejects) are set aside as JSON lines in
+``<path>.rejected`` so the journal can move past them.
+"""
+import json
+import os
+import struct
+import threading
+import zlib
+from typing import List, Optional, Tuple
+from ..config import data_dir, env_int, env_str
+
+DURABILITY_MODES = ("always", "interval", "never")
+HEADER = struct.Struct("<II")
+
+
+class MessageJournal:
+    def __init__(self, path: str, durability: str = "interval", interval_ms: int = 100):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown journal durability: {durability}")
+        self.path = path
+        self.durability = durability
+        self.interval = interval_ms / 1000
+        self.last_seq = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._closed = threading.Event()
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.recovered = self._read()
+        if self.recovered:
+            self.last_seq = self.recovered[-1][0]
+        # Unbuffered: every append is one write() straight to the OS.
+        self._file = open(self.path, "ab", buffering=0)
+
+        self._syncer = None
+        if durability == "interval":
+            self._syncer = threading.Thread(
+                target=self._sync_loop, name="journal-fsync", daemon=True)
+            self._syncer.start()
+
+    @classmethod
+    def from_env(cls, directory: Optional[str] = None) -> Optional["MessageJournal"]:
+        durability = env_str("MYCHATBOT_JOURNAL", "interval")
+        if durability == "off":
+            return None
+        return cls(
+            os.path.join(directory or data_dir(), "pending_messages.journal"),
+            durability=durability if durability in DURABILITY_MODES else "interval",
+            interval_ms=env_int("MYCHATBOT_JOURNAL_INTERVAL_MS", 100),
+        )
+
+    def _read(self) -> List[Tuple[int, dict]]:
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        valid_end = 0
+        with open(self.path, "rb") as handle:
+            data = handle.read()
+        while valid_end + HEADER.size <= len(data):
+            length, checksum = HEADER.unpack_from(data, valid_end)
+            start = valid_end + HEADER.size
+            payload = data[start:start + length]
+            if len(payload) < length or zlib.crc32(payload) != checksum:
+                break
+            record = json.loads(payload)
+            records.append((record.pop("seq"), record))
+            valid_end = start + length
+        if valid_end < len(data):
+            # Torn write from a crash: drop it so new records follow a valid frame.
+            with open(self.path, "r+b") as handle:
+                handle.truncate(valid_end)
+        return records
+
+    def start_seq(self, applied_seq: int):
+        """Continue numbering after whatever the database already applied."""
+        with self._lock:
+            self.last_seq = max(self.last_seq, applied_seq)
+
+    def pending(self, applied_seq: int) -> List[Tuple[int, dict]]:
+        """Records from the previous run that never reached the database."""
+        return [(seq, record) for seq, record in self.recovered if seq > applied_seq]
+
+    def append(self, record: dict) -> int:
+        with self._lock:
+            self.last_seq += 1
+            payload = json.dumps({"seq": self.last_seq, **record},
+                                 separators=(",", ":")).encode("utf-8")
+            self._file.write(HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+            if self.durability == "always":
+                os.fsync(self._file.fileno())
+            else:
+                self._dirty = True
+            return self.last_seq
+
+    def sync(self):
+        with self._lock:
+            if not self._dirty or self._file.closed:
+                return
+            self._dirty = False
+            fileno = self._file.fileno()
+        # Outside the lock so appends on the UI thread don't wait on the disk.
+        os.fsync(fileno)
+
+    def _sync_loop(self):
+        while not self._closed.wait(self.interval):
+            self.sync()
+
+    @property
+    def rejected_path(self) -> str:
+        return self.path + ".rejected"
+
+    def reject(self, seq: Optional[int], record: dict, reason: str):
+        line = json.dumps({"seq": seq, "reason": reason, "record": record}, default=str)
+        with self._lock, open(self.rejected_path, "a", encoding="utf-8") as handle:
+            handle.write(line + "\n")
+
+    def compact(self, applied_seq: int) -> bool:
+        """Empty the journal once everything in it is in the database."""
+        with self._lock:
+            if applied_seq < self.last_seq or self._file.tell() == 0:
+                return False
+            self._file.truncate(0)
+            self._file.seek(0)
+            if self.durability != "never":
+                os.fsync(self._file.fileno())
+            self._dirty = False
+            self.recovered = []
+            return True
+
+    def close(self):
+        self._closed.set()
+        if self._syncer is not None:
+            self._syncer.join()
+        self.sync()
+        with self._lock:
+            self._file.close()
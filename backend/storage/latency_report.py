@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Latency percentiles from the request_timings table.
+
+    python -m backend.storage.latency_report --days 30 --by day
+    python -m backend.storage.latency_report --by model
+    python -m backend.storage.latency_report --by length
+
+Columns are seconds: "total" is send to render, "ttfb" is request start to
+first response byte, "api" is request start to completion and "render" is
+completion to the message widget being built.
+"""
+import argparse
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from ..agents.dataset_agent import DatasetAgent
+
+LENGTH_BUCKETS = [(500, "<500"), (2000, "500-2k"), (8000, "2k-8k")]
+METRICS = {
+    "total": ("sent_at", "rendered_at"),
+    "ttfb": ("request_started_at", "first_byte_at"),
+    "api": ("request_started_at", "completed_at"),
+    "render": ("completed_at", "rendered_at"),
+}
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    index = (len(values) - 1) * p
+    lower = int(index)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (index - lower)
+
+
+def length_bucket(row: dict) -> str:
+    chars = row["response_chars"] or 0
+    for limit, label in LENGTH_BUCKETS:
+        if chars < limit:
+            return label
+    return ">=8k"
+
+
+GROUPINGS: Dict[str, Callable[[dict], str]] = {
+    "day": lambda row: datetime.fromtimestamp(row["sent_at"]).strftime("%Y-%m-%d"),
+    "model": lambda row: row["model"] or "unknown",
+    "length": length_bucket,
+}
+
+
+def summarize(rows: List[dict], group_by: str) -> Dict[str, dict]:
+    key_for = GROUPINGS[group_by]
+    groups: Dict[str, List[dict]] = {}
+    for row in rows:
+        groups.setdefault(key_for(row), []).append(row)
+
+    summary = {}
+    for key, group in sorted(groups.items()):
+        summary[key] = {"count": len(group)}
+        for metric, (start, end) in METRICS.items():
+            durations = [row[end] - row[start] for row in group
+                         if row[start] is not None and row[end] is not None]
+            summary[key][metric] = {p: percentile(durations, p / 100) for p in (50, 95, 99)}
+    return summary
+
+
+def format_cell(stats: dict) -> str:
+    return "/".join("-" if stats[p] is None else f"{stats[p]:.2f}" for p in (50, 95, 99))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report request latency percentiles")
+    parser.add_argument("--db", help="Path to chat_dataset.db (defaults to the app database)")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--by", choices=sorted(GROUPINGS), default="day")
+    args = parser.parse_args()
+
+    rows = DatasetAgent(args.db).get_request_timings(since=time.time() - args.days * 86400)
+    if not rows:
+        print("No request timings recorded in this period")
+        return
+
+    print(f"p50/p95/p99 seconds by {args.by}, last {args.days} days")
+    header = f"{args.by:<24} {'n':>6}" + "".join(f" {metric:>20}" for metric in METRICS)
+    print(header)
+    for key, stats in summarize(rows, args.by).items():
+        print(f"{key:<24} {stats['count']:>6}" +
+              "".join(f" {format_cell(stats[metric]):>20}" for metric in METRICS))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Dataset maintenance: deduplicate messages, move old conversations into
+per-month archive databases and reclaim free pages from the hot database.
+
+    python -m backend.storage.maintenance --archive-days 90
+
+Every step works in small transactions with a pause in between, so it can run
+while the app is open.
+"""
+import argparse
+import os
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime, timedelta
+from typing import List, Optional
+from ..agents.dataset_agent import DatasetAgent, open_connection
+
+
+class DatasetMaintenance:
+    def __init__(self, agent: DatasetAgent, chunk_size: int = 500,
+                 pause: float = 0.05, log=print):
+        self.agent = agent
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self.log = log
+
+    def _connect(self) -> sqlite3.Connection:
+        return open_connection(self.agent.db_path)
+
+    def _yield_to_app(self):
+        if self.pause:
+            time.sleep(self.pause)
+
+    def _message_columns(self, conn: sqlite3.Connection, schema: str = "main") -> List[str]:
+        return [row[1] for row in conn.execute(f"PRAGMA {schema}.table_info(messages)")]
+
+    def backfill_hashes(self) -> int:
+        codec = self.agent.codec
+        updated = 0
+        with closing(self._connect()) as conn:
+            while True:
+                rows = conn.execute("""
+                    SELECT id, content, encoding FROM messages
+                    WHERE content_hash IS NULL
+                    LIMIT ?
+                """, (self.chunk_size,)).fetchall()
+                if not rows:
+                    break
+                conn.executemany(
+                    "UPDATE messages SET content_hash = ? WHERE id = ?",
+                    [(DatasetAgent.content_hash(codec.decode(content, encoding)), message_id)
+                     for message_id, content, encoding in rows])
+                conn.commit()
+                updated += len(rows)
+                self._yield_to_app()
+        self.log(f"Hashed {updated} messages")
+        return updated
+
+    def deduplicate(self) -> int:
+        """Remove double-writes of the same message.
+
+        Only a row that repeats the message directly before it in the same
+        conversation (same sender, content hash and created_at) counts, so
+        repeated turns such as "continue" or "thanks" are kept.
+        """
+        codec = self.agent.codec
+        removed = 0
+        with closing(self._connect()) as conn:
+            while True:
+                rows = conn.execute("""
+                    SELECT m.id, m.content, m.encoding
+                    FROM messages m
+                    WHERE m.content_hash IS NOT NULL
+                      AND EXISTS (
+                          SELECT 1 FROM messages prev
+                          WHERE prev.id = (
+                                SELECT MAX(p.id) FROM messages p
+                                WHERE p.conversation_id = m.conversation_id
+                                  AND p.id < m.id
+                            )
+                            AND prev.content_hash = m.content_hash
+                            AND prev.sender_id = m.sender_id
+                            AND prev.created_at IS m.created_at
+                      )
+                    LIMIT ?
+                """, (self.chunk_size,)).fetchall()
+                if not rows:
+                    break
+                conn.executemany(
+                    "INSERT INTO messages_fts (messages_fts, rowid, content) VALUES ('delete', ?, ?)",
+                    [(message_id, codec.decode(content, encoding))
+                     for message_id, content, encoding in rows])
+                conn.executemany("DELETE FROM messages WHERE id = ?",
+                                 [(row[0],) for row in rows])
+                conn.commit()
+                removed += len(rows)
+                self._yield_to_app()
+        self.log(f"Removed {removed} duplicate messages")
+        return removed
+
+    def archive(self, older_than_days: int) -> int:
+        cutoff = (datetime.utcnow() - timedelta(days=older_than_days)).strftime("%Y-%m-%d %H:%M:%S")
+        with closing(self._connect()) as conn:
+            conversations = conn.execute("""
+                SELECT conversation_id, strftime('%Y_%m', MAX(created_at))
+                FROM messages
+                GROUP BY conversation_id
+                HAVING MAX(created_at) < ?
+            """, (cutoff,)).fetchall()
+
+        by_month = {}
+        for conversation_id, month in conversations:
+            by_month.setdefault(month, []).append(conversation_id)
+
+        moved = 0
+        for month, conversation_ids in sorted(by_month.items()):
+            moved += self._archive_month(month, conversation_ids)
+        self.log(f"Archived {moved} messages from {len(conversations)} conversations")
+        return moved
+
+    def _archive_month(self, month: str, conversation_ids: List[str]) -> int:
+        codec = self.agent.codec
+        archive_path = self.agent.archive_path(month)
+        # Creating the archive through DatasetAgent gives it the same schema.
+        DatasetAgent(archive_path, codec=codec)
+
+        moved = 0
+        with closing(self._connect()) as conn:
+            conn.execute("ATTACH DATABASE ? AS archive", (archive_path,))
+            columns = [c for c in self._message_columns(conn)
+                       if c in set(self._message_columns(conn, "archive"))]
+            column_list = ", ".join(columns)
+            content_index = columns.index("content")
+            encoding_index = columns.index("encoding")
+            placeholders = ", ".join("?" for _ in columns)
+
+            try:
+                for conversation_id in conversation_ids:
+                    while True:
+                        rows = conn.execute(f"""
+                            SELECT {column_list} FROM main.messages
+                            WHERE conversation_id = ?
+                            ORDER BY id
+                            LIMIT ?
+                        """, (conversation_id, self.chunk_size)).fetchall()
+                        if not rows:
+                            break
+
+                        sender_ids = {row[columns.index("sender_id")] for row in rows}
+                        conn.executemany("""
+                            INSERT OR IGNORE INTO archive.profiles
+                            SELECT * FROM main.profiles WHERE id = ?
+                        """, [(sender_id,) for sender_id in sender_ids])
+
+                        # The commit is not atomic across the two files, so a
+                        # rerun after an interruption can find rows already
+                        # archived; indexing those again would double their
+                        # postings in the contentless FTS table.
+                        ids = [row[0] for row in rows]
+                        archived = {row[0] for row in conn.execute(f"""
+                            SELECT id FROM archive.messages
+                            WHERE id IN ({", ".join("?" for _ in ids)})
+                        """, ids)}
+                        conn.executemany(
+                            f"INSERT OR IGNORE INTO archive.messages ({column_list}) VALUES ({placeholders})",
+                            rows)
+                        plain = [(row[0], codec.decode(row[content_index], row[encoding_index]))
+                                 for row in rows]
+                        conn.executemany(
+                            "INSERT INTO archive.messages_fts (rowid, content) VALUES (?, ?)",
+                            [item for item in plain if item[0] not in archived])
+                        conn.executemany(
+                            "INSERT INTO main.messages_fts (messages_fts, rowid, content) VALUES ('delete', ?, ?)",
+                            plain)
+                        conn.executemany("DELETE FROM main.messages WHERE id = ?",
+                                         [(row[0],) for row in rows])
+                        conn.commit()
+                        moved += len(rows)
+                        self._yield_to_app()
+            finally:
+                conn.commit()
+                conn.execute("DETACH DATABASE archive")
+        return moved
+
+    def vacuum(self, pages_per_step: int = 256, full: bool = False) -> int:
+        conn = self._connect()
+        try:
+            mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+            if mode != 2:
+                if not full:
+                    self.log("Incremental vacuum is not enabled on this database; "
+                             "run once with --full-vacuum to convert it")
+                    return 0
+                # One-off blocking conversion of databases created before
+                # auto_vacuum was set.
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+                self.log("Converted database to incremental vacuum")
+                return 0
+
+            freed = 0
+            while True:
+                free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                if free_pages == 0:
+                    break
+                conn.execute(f"PRAGMA incremental_vacuum({pages_per_step})")
+                conn.commit()
+                freed += min(free_pages, pages_per_step)
+                self._yield_to_app()
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self.log(f"Released {freed} free pages")
+            return freed
+        finally:
+            conn.close()
+
+    def run(self, archive_days: Optional[int] = None, dedup: bool = True,
+            full_vacuum: bool = False):
+        self.backfill_hashes()
+        if dedup:
+            self.deduplicate()
+        if archive_days is not None:
+            self.archive(archive_days)
+        self.vacuum(full=full_vacuum)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the chat dataset database")
+    parser.add_argument("--db", help="Path to chat_dataset.db (defaults to the app database)")
+    parser.add_argument("--archive-days", type=int,
+                        help="Move conversations idle for more than N days into monthly archives")
+    parser.add_argument("--no-dedup", action="store_true", help="Skip duplicate removal")
+    parser.add_argument("--full-vacuum", action="store_true",
+                        help="Convert an older database to incremental vacuum (blocks writers)")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--pause", type=float, default=0.05,
+                        help="Seconds to sleep between chunks")
+    args = parser.parse_args()
+
+    agent = DatasetAgent(args.db)
+    DatasetMaintenance(agent, chunk_size=args.chunk_size, pause=args.pause).run(
+        archive_days=args.archive_days,
+        dedup=not args.no_dedup,
+        full_vacuum=args.full_vacuum,
+    )
+    for path in [agent.db_path] + agent.archive_paths():
+        print(f"{os.path.getsize(path) / 1024:>10.1f} KiB  {path}")
+
+
+if __name__ == "__main__":
+    main()
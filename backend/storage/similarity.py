@@ -0,0 +1,369 @@
+"""
+Local similar-prompt index over past user messages and the AI replies that
+followed them.
+
+Each prompt is reduced to a 256-bit SimHash of its hashed character trigrams
+(a random-hyperplane signature, so Hamming distance tracks cosine distance).
+Signatures are split into 10-bit bands; each band keeps a sorted key array so
+a lookup is a couple of dozen binary searches plus a Hamming re-rank of the
+rows that share at least one band with the query. Rows added since the last
+merge sit in a small unsorted tail that is scanned directly.
+
+    python -m backend.storage.similarity "how do I reverse a list"
+"""
+import argparse
+import json
+import math
+import os
+import re
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+from ..agents.dataset_agent import DatasetAgent
+from ..models.message import Message
+
+try:
+    import numpy as np
+except ImportError:  # optional; similar-answer suggestions are disabled without it
+    np = None
+
+SIGNATURE_BITS = 256
+# Short bands trade a larger re-rank for recall on paraphrases (cosine ~0.7).
+BAND_BITS = 10
+NGRAM_SIZES = (3,)
+MAX_PROMPT_CHARS = 2000
+# Tail rows are merged into the sorted bands once there are this many.
+MERGE_EVERY = 20000
+# Cap per band bucket so a very common prompt ("hi") can't flood the re-rank.
+MAX_BUCKET = 4000
+
+_WORD_RE = re.compile(r"\w+")
+_SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+
+
+def available() -> bool:
+    return np is not None
+
+
+def _mix(values):
+    # splitmix64 finaliser, vectorised over a uint64 array.
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(0xBF58476D1CE4E5B9)
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def normalize(text: str) -> str:
+    return " ".join(_WORD_RE.findall(text[:MAX_PROMPT_CHARS].lower()))
+
+
+def signature(text: str):
+    """Pack the SimHash of ``text`` into SIGNATURE_BITS // 8 bytes."""
+    normalized = normalize(text)
+    codes = np.frombuffer(f" {normalized} ".encode("utf-32-le"), dtype=np.uint32)
+    codes = codes.astype(np.uint64)
+
+    grams = []
+    for size in NGRAM_SIZES:
+        if len(codes) < size:
+            continue
+        gram = np.full(len(codes) - size + 1, size, dtype=np.uint64)
+        for offset in range(size):
+            gram = _mix(gram ^ codes[offset:len(codes) - size + 1 + offset])
+        grams.append(gram)
+    if not grams:
+        return np.zeros(SIGNATURE_BITS // 8, dtype=np.uint8)
+
+    features, counts = np.unique(np.concatenate(grams), return_counts=True)
+    weights = 1.0 + np.log(counts)
+    words = np.stack([_mix(features ^ np.uint64(seed)) for seed in _SEEDS], axis=1)
+    bits = np.unpackbits(words.view(np.uint8), axis=1)[:, :SIGNATURE_BITS]
+    totals = weights @ (bits.astype(np.float32) * 2.0 - 1.0)
+    return np.packbits(totals > 0)
+
+
+def band_keys(signatures):
+    """(rows, bands) uint16 keys from packed (rows, SIGNATURE_BITS // 8) signatures."""
+    bands = SIGNATURE_BITS // BAND_BITS
+    bits = np.unpackbits(signatures, axis=1)[:, :bands * BAND_BITS]
+    weights = (1 << np.arange(BAND_BITS, dtype=np.uint16))
+    return bits.reshape(len(signatures), bands, BAND_BITS).astype(np.uint16) @ weights
+
+
+_POPCOUNT = None
+
+
+def hamming(signatures, query):
+    """Bit distance between each packed signature row and ``query``."""
+    global _POPCOUNT
+    diff = np.bitwise_xor(signatures.view(np.uint64), query.view(np.uint64))
+    if hasattr(np, "bitwise_count"):  # NumPy 2.0+
+        return np.bitwise_count(diff).sum(axis=1, dtype=np.int64)
+    if _POPCOUNT is None:
+        _POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+    return _POPCOUNT[diff.view(np.uint8)].sum(axis=1)
+
+
+class SimilarAnswer:
+    def __init__(self, prompt: str, answer: str, score: float, conversation_id: str,
+                 prompt_id: int, answer_id: int):
+        self.prompt = prompt
+        self.answer = answer
+        self.score = score
+        self.conversation_id = conversation_id
+        self.prompt_id = prompt_id
+        self.answer_id = answer_id
+
+
+class SimilarityIndex:
+    """Prompt signatures with the id of the reply that answered each one.
+
+    add_messages() is safe to call from the dataset writer thread while the
+    UI thread runs find(); both take the same lock, and neither holds it for
+    longer than a band merge.
+    """
+
+    def __init__(self, agent: DatasetAgent, path: Optional[str] = None,
+                 min_score: float = 0.65):
+        self.agent = agent
+        self.path = path or os.path.join(
+            os.path.dirname(agent.db_path), "similarity_index.npz")
+        self.min_score = min_score
+        self.ready = False
+        self._lock = threading.Lock()
+        self._ai_senders = set()
+        self._backlog: List[Message] = []
+        self._reset()
+
+    def _reset(self):
+        self.last_message_id = 0
+        # conversation_id -> row of the latest prompt still waiting for a reply
+        self._awaiting_reply: Dict[str, int] = {}
+        self.size = 0
+        self._signatures = np.zeros((1024, SIGNATURE_BITS // 8), dtype=np.uint8)
+        self._prompt_ids = np.zeros(1024, dtype=np.int64)
+        self._reply_ids = np.full(1024, -1, dtype=np.int64)
+        self._merged = 0
+        self._band_keys = [np.zeros(0, dtype=np.uint16) for _ in range(self.bands)]
+        self._band_rows = [np.zeros(0, dtype=np.int64) for _ in range(self.bands)]
+
+    @property
+    def bands(self) -> int:
+        return SIGNATURE_BITS // BAND_BITS
+
+    def load(self) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        with np.load(self.path) as data:
+            self.size = len(data["prompt_ids"])
+            self._signatures = data["signatures"].copy()
+            self._prompt_ids = data["prompt_ids"].copy()
+            self._reply_ids = data["reply_ids"].copy()
+            state = json.loads(str(data["state"]))
+        self.last_message_id = state["last_message_id"]
+        self._awaiting_reply = state["awaiting_reply"]
+        self._merged = 0
+        self._merge_tail()
+        return True
+
+    def save(self):
+        with self._lock:
+            state = json.dumps({
+                "last_message_id": self.last_message_id,
+                "awaiting_reply": self._awaiting_reply,
+            })
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "wb") as handle:
+                np.savez(handle,
+                         signatures=self._signatures[:self.size],
+                         prompt_ids=self._prompt_ids[:self.size],
+                         reply_ids=self._reply_ids[:self.size],
+                         state=np.array(state))
+            os.replace(tmp_path, self.path)
+
+    def open(self, batch_size: int = 2000,
+             cancelled: Optional[Callable[[], bool]] = None) -> "SimilarityIndex":
+        """Load the saved index, then index whatever was written after it.
+
+        ``cancelled`` is polled between batches; if it returns True the index
+        is left not ready and nothing is saved.
+        """
+        try:
+            self.load()
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Rebuilding similarity index: {e}")
+            self._reset()
+
+        self._ai_senders = set(self.agent.get_profile_ids("ai"))
+        batch = []
+        for message in self.agent.iter_messages(batch_size, after_id=self.last_message_id):
+            batch.append(message)
+            if len(batch) >= batch_size:
+                self.add_messages(batch, catching_up=True)
+                batch = []
+                if cancelled is not None and cancelled():
+                    return self
+        self.add_messages(batch, catching_up=True)
+
+        # Listener calls keep landing in the backlog until it is found empty
+        # and ready is set in the same critical section; flipping ready first
+        # would let newer live ids overtake (and drop) the backlogged ones.
+        while True:
+            with self._lock:
+                backlog, self._backlog = self._backlog, []
+                if not backlog:
+                    self.ready = True
+                    break
+            self.add_messages(backlog, catching_up=True)
+        return self
+
+    def _grow(self, needed: int):
+        capacity = len(self._prompt_ids)
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2)
+        signatures = np.zeros((capacity, SIGNATURE_BITS // 8), dtype=np.uint8)
+        signatures[:self.size] = self._signatures[:self.size]
+        prompt_ids = np.zeros(capacity, dtype=np.int64)
+        prompt_ids[:self.size] = self._prompt_ids[:self.size]
+        reply_ids = np.full(capacity, -1, dtype=np.int64)
+        reply_ids[:self.size] = self._reply_ids[:self.size]
+        self._signatures, self._prompt_ids, self._reply_ids = signatures, prompt_ids, reply_ids
+
+    def _merge_tail(self):
+        if self._merged == self.size:
+            return
+        keys = band_keys(self._signatures[self._merged:self.size])
+        rows = np.arange(self._merged, self.size, dtype=np.int64)
+        for band in range(self.bands):
+            order = np.argsort(keys[:, band], kind="stable")
+            new_keys, new_rows = keys[order, band], rows[order]
+            at = np.searchsorted(self._band_keys[band], new_keys, side="right")
+            self._band_keys[band] = np.insert(self._band_keys[band], at, new_keys)
+            self._band_rows[band] = np.insert(self._band_rows[band], at, new_rows)
+        self._merged = self.size
+
+    def add_messages(self, messages: Iterable[Message], catching_up: bool = False):
+        """Index prompts and pair AI replies with the prompt they answer.
+
+        Registered as a DatasetAgent listener, so it sees every committed
+        message; anything that arrives before open() finishes is held back and
+        applied once the catch-up scan is done.
+        """
+        messages = list(messages)
+        with self._lock:
+            if not self.ready and not catching_up:
+                self._backlog.extend(messages)
+                return
+        if any(m.sender_id not in self._ai_senders for m in messages):
+            self._ai_senders = set(self.agent.get_profile_ids("ai"))
+
+        prompts = [m for m in messages
+                   if m.id is not None and m.id > self.last_message_id
+                   and m.sender_id not in self._ai_senders]
+        signatures = {m.id: signature(m.content) for m in prompts}
+
+        with self._lock:
+            for message in messages:
+                if message.id is None or message.id <= self.last_message_id:
+                    continue
+                self.last_message_id = message.id
+                if message.sender_id in self._ai_senders:
+                    row = self._awaiting_reply.pop(message.conversation_id, None)
+                    if row is not None:
+                        self._reply_ids[row] = message.id
+                    continue
+                self._grow(self.size + 1)
+                self._signatures[self.size] = signatures[message.id]
+                self._prompt_ids[self.size] = message.id
+                self._reply_ids[self.size] = -1
+                self._awaiting_reply[message.conversation_id] = self.size
+                self.size += 1
+            if self.size - self._merged >= MERGE_EVERY:
+                self._merge_tail()
+
+    def add_signatures(self, signatures, prompt_ids, reply_ids):
+        """Bulk-append precomputed rows, e.g. from an import or a benchmark."""
+        with self._lock:
+            count = len(prompt_ids)
+            self._grow(self.size + count)
+            self._signatures[self.size:self.size + count] = signatures
+            self._prompt_ids[self.size:self.size + count] = prompt_ids
+            self._reply_ids[self.size:self.size + count] = reply_ids
+            self.size += count
+            self._merge_tail()
+
+    def nearest(self, text: str, limit: int = 3) -> List[tuple]:
+        """(score, prompt_id, reply_id) for the closest answered prompts."""
+        query = signature(text)
+        query_bands = band_keys(query[None, :])[0]
+        with self._lock:
+            candidates = [np.arange(self._merged, self.size, dtype=np.int64)]
+            for band in range(self.bands):
+                keys = self._band_keys[band]
+                low = np.searchsorted(keys, query_bands[band], side="left")
+                high = np.searchsorted(keys, query_bands[band], side="right")
+                candidates.append(self._band_rows[band][low:min(high, low + MAX_BUCKET)])
+            # Duplicates across bands are cheaper to re-rank than to remove.
+            rows = np.concatenate(candidates)
+            rows = rows[self._reply_ids[rows] >= 0]
+            if not len(rows):
+                return []
+            distances = hamming(self._signatures[rows], query)
+            prompt_ids = self._prompt_ids[rows]
+            reply_ids = self._reply_ids[rows]
+
+        scores = np.cos(math.pi * distances / SIGNATURE_BITS)
+        keep = np.nonzero(scores >= self.min_score)[0]
+        results = {}
+        for i in keep[np.argsort(-scores[keep], kind="stable")]:
+            results.setdefault(int(prompt_ids[i]), (float(scores[i]), int(prompt_ids[i]),
+                                                    int(reply_ids[i])))
+            if len(results) == limit:
+                break
+        return list(results.values())
+
+    def find(self, text: str, limit: int = 3) -> List[SimilarAnswer]:
+        if not self.ready or not normalize(text):
+            return []
+        matches = self.nearest(text, limit)
+        if not matches:
+            return []
+        messages = self.agent.get_messages(
+            [prompt_id for _, prompt_id, _ in matches] +
+            [reply_id for _, _, reply_id in matches])
+        results = []
+        for score, prompt_id, reply_id in matches:
+            # Archived or deduplicated rows drop out of the hot database.
+            if prompt_id in messages and reply_id in messages:
+                results.append(SimilarAnswer(
+                    prompt=messages[prompt_id].content,
+                    answer=messages[reply_id].content,
+                    score=score,
+                    conversation_id=messages[prompt_id].conversation_id,
+                    prompt_id=prompt_id,
+                    answer_id=reply_id
+                ))
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Look up similar past prompts")
+    parser.add_argument("query")
+    parser.add_argument("--db", help="Database path (default: chat_dataset.db)")
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--min-score", type=float, default=0.5)
+    args = parser.parse_args()
+
+    if not available():
+        parser.error("numpy is required for the similarity index")
+
+    index = SimilarityIndex(DatasetAgent(args.db), min_score=args.min_score).open()
+    index.save()
+    for match in index.find(args.query, args.limit):
+        print(f"{match.score:.2f}  {match.prompt[:80]!r}")
+        print(f"      -> {match.answer[:120]!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Token usage report read from the aggregate tables in chat_dataset.db.
+
+    python -m backend.storage.usage_report --days 14 --top 10
+    python -m backend.storage.usage_report --conversation <conversation id>
+"""
+import argparse
+from ..agents.dataset_agent import DatasetAgent
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report token usage per day and per conversation")
+    parser.add_argument("--db", help="Path to chat_dataset.db (defaults to the app database)")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--top", type=int, default=10,
+                        help="Show the N conversations with the largest prompt totals")
+    parser.add_argument("--conversation", help="Show totals for a single conversation")
+    args = parser.parse_args()
+
+    agent = DatasetAgent(args.db)
+
+    if args.conversation:
+        usage = agent.get_conversation_usage(args.conversation)
+        if usage is None:
+            print(f"No usage recorded for {args.conversation}")
+        else:
+            for key, value in usage.items():
+                print(f"{key:>18}: {value}")
+        return
+
+    print(f"{'day':<12} {'model':<24} {'responses':>9} {'prompt':>10} {'completion':>10}")
+    for row in agent.get_daily_usage(args.days):
+        print(f"{row['day']:<12} {row['model']:<24} {row['responses']:>9} "
+              f"{row['prompt_tokens']:>10} {row['completion_tokens']:>10}")
+
+    print(f"\nTop {args.top} conversations by prompt tokens")
+    print(f"{'conversation':<38} {'responses':>9} {'prompt':>10} {'completion':>10} {'avg prompt':>10}")
+    for row in agent.get_top_conversations_by_prompt_tokens(args.top):
+        average = row["prompt_tokens"] // max(row["responses"], 1)
+        print(f"{row['conversation_id']:<38} {row['responses']:>9} {row['prompt_tokens']:>10} "
+              f"{row['completion_tokens']:>10} {average:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Times replaying a conversation into MainWindow through the bulk insertion path
+(add_messages) and, optionally, through one add_message() call per message.
+
+    python -m benchmarks.bench_bulk_insert --messages 1000 --target-ms 1500
+
+Exits with status 1 when the bulk path misses --target-ms.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PySide6 import QtWidgets as qtw
+from frontend import theme
+from frontend.views.main_window import MainWindow
+
+
+def synthetic_history(count: int):
+    for i in range(count):
+        if i % 2 == 0:
+            yield (f"Question {i}: how do I reverse a list in Python?", True)
+        else:
+            yield (f"Answer {i}: use `reversed(items)` or slicing:\n\n"
+                   "```python\nitems[::-1]\n```\n\n" + "More detail. " * (i % 40), False)
+
+
+def run_bulk(app: qtw.QApplication, history) -> float:
+    window = MainWindow(controller=None)
+    window.show()
+    app.processEvents()
+
+    done = []
+    window.history_loaded.connect(done.append)
+    start = time.perf_counter()
+    window.add_messages(history)
+    while not done:
+        app.processEvents()
+    # The final scroll and visibility pass run on the next event loop turn.
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+
+    stats = window.transcript_stats()
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+    print(f"  live widgets after load: {stats['live_widgets']}/{stats['messages']}")
+    return elapsed * 1000
+
+
+def run_naive(app: qtw.QApplication, history) -> float:
+    window = MainWindow(controller=None)
+    window.show()
+    app.processEvents()
+
+    start = time.perf_counter()
+    for message, is_user in history:
+        window.add_message(message, is_user)
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+    return elapsed * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--target-ms", type=float, default=1500)
+    parser.add_argument("--compare-naive", action="store_true",
+                        help="Also time one add_message() call per message")
+    args = parser.parse_args()
+
+    app = qtw.QApplication([])
+    theme.apply(app)
+    history = list(synthetic_history(args.messages))
+
+    bulk_ms = run_bulk(app, history)
+    print(f"bulk add_messages: {bulk_ms:.0f} ms for {args.messages} messages "
+          f"(target {args.target_ms:.0f} ms)")
+
+    if args.compare_naive:
+        naive_ms = run_naive(app, history)
+        print(f"per-message add_message: {naive_ms:.0f} ms")
+
+    sys.exit(0 if bulk_ms <= args.target_ms else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Measures code block highlighting for a large AI reply: cold lexing, cached
+re-render, and how long the GUI thread is blocked building the message widget
+versus when the highlighted version lands.
+
+    python -m benchmarks.bench_highlight --lines 2000
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PySide6 import QtCore as qtc
+from PySide6 import QtWidgets as qtw
+from frontend import theme
+from frontend.components.chat_message import ChatMessageWidget
+from frontend.components.code_highlighter import CodeHighlighter, highlight_code, shared_highlighter
+
+SNIPPET = [
+    "def handler_{n}(request, retries=3):",
+    "    # retry the request a few times before giving up",
+    "    for attempt in range(retries):",
+    "        response = request.send(timeout=2.5 * attempt)",
+    "        if response.status == 200:",
+    "            return response.json()['data']",
+    "    raise RuntimeError(\"request {n} failed\")",
+    "",
+]
+
+
+def synthetic_reply(lines: int) -> str:
+    code = []
+    n = 0
+    while len(code) < lines:
+        code.extend(line.format(n=n) for line in SNIPPET)
+        n += 1
+    return ("Here is the full module:\n\n```python\n" + "\n".join(code[:lines]) +
+            "\n```\n\nLet me know if you need changes.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=2000)
+    args = parser.parse_args()
+
+    app = qtw.QApplication([])
+    theme.apply(app)
+    reply = synthetic_reply(args.lines)
+    code = reply.split("```python\n", 1)[1].rsplit("\n```", 1)[0]
+
+    start = time.perf_counter()
+    highlight_code("python", code)
+    print(f"lex {args.lines} lines:              {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+    highlighter = CodeHighlighter()
+    highlighter.request("python", code)
+    qtc.QThreadPool.globalInstance().waitForDone()
+    start = time.perf_counter()
+    highlighter.render_markdown(reply)
+    print(f"render with cached block:     {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+    shared = shared_highlighter()
+    done = []
+    shared.block_ready.connect(done.append)
+    start = time.perf_counter()
+    widget = ChatMessageWidget(reply, is_user=False)
+    widget.show()
+    blocked = time.perf_counter() - start
+    while not done:
+        app.processEvents()
+    app.processEvents()
+    highlighted = time.perf_counter() - start
+    print(f"widget construction (GUI):    {blocked * 1000:8.1f} ms")
+    print(f"highlighted version applied:  {highlighted * 1000:8.1f} ms")
+
+    start = time.perf_counter()
+    ChatMessageWidget(reply, is_user=False)
+    print(f"second widget, warm cache:    {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Generates a synthetic JSONL chat export and imports it into a scratch
+database with BulkImporter, then imports it again to show the duplicate skip.
+
+    python -m benchmarks.bench_import --messages 300000 --workers 4
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.agents.dataset_agent import DatasetAgent
+from backend.storage.importer import BulkImporter
+
+WORDS = ("python list dict parse merge thread socket regex table query index "
+         "model answer request error stack value file async cache batch").split()
+
+
+def write_export(path: str, messages: int, per_conversation: int = 20):
+    rng = random.Random(0)
+    with open(path, "w", encoding="utf-8") as handle:
+        for i in range(messages):
+            length = rng.randint(8, 120) if i % 2 == 0 else rng.randint(40, 600)
+            handle.write(json.dumps({
+                "conversation_id": f"bench-{i // per_conversation}",
+                "role": "user" if i % 2 == 0 else "assistant",
+                "content": " ".join(rng.choice(WORDS) for _ in range(length)),
+                "created_at": 1_700_000_000 + i,
+            }) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=300_000)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--chunk-mb", type=float, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        export = os.path.join(tmp, "export.jsonl")
+        write_export(export, args.messages)
+        print(f"export: {os.path.getsize(export) / (1024 * 1024):.1f} MiB, {args.messages} messages")
+
+        agent = DatasetAgent(os.path.join(tmp, "bench.db"))
+        importer = BulkImporter(agent, workers=args.workers,
+                                chunk_bytes=int(args.chunk_mb * 1024 * 1024), log=lambda _: None)
+        first = importer.run([export])
+        print(f"import:   {first['imported']} messages in {first['seconds']}s "
+              f"({first['messages_per_minute']:,} messages/min)")
+
+        # A second, unrelated copy of the same data: every row is a duplicate.
+        copy = os.path.join(tmp, "export-copy.jsonl")
+        os.link(export, copy)
+        second = importer.run([copy])
+        print(f"re-import: {second['duplicates']} duplicates skipped in {second['seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Cost of each MessageJournal durability mode: per-append latency on the
+calling (UI) thread, and end-to-end time for a DatasetWriter to commit the
+same messages. "off" is the writer without a journal.
+
+    python -m benchmarks.bench_journal --messages 2000
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.agents.dataset_agent import DatasetWriter
+from backend.models.message import Message
+from backend.storage.journal import DURABILITY_MODES, MessageJournal
+
+LOSS_WINDOW = {
+    "off": "queued items (up to flush interval + backlog)",
+    "never": "OS crash / power loss only",
+    "interval": "{interval_ms} ms",
+    "always": "none",
+}
+
+
+def run_mode(mode: str, messages: int, interval_ms: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = None
+        if mode != "off":
+            journal = MessageJournal(os.path.join(tmp, "pending_messages.journal"),
+                                     durability=mode, interval_ms=interval_ms)
+        writer = DatasetWriter(os.path.join(tmp, "bench.db"), journal=journal)
+        writer.start()
+
+        latencies = []
+        started = time.perf_counter()
+        for i in range(messages):
+            message = Message(conversation_id=f"bench-{i // 20}", sender_id="bench",
+                              content=f"message {i} " + "lorem ipsum " * 20)
+            before = time.perf_counter()
+            writer.log_message(message)
+            latencies.append((time.perf_counter() - before) * 1_000_000)
+        writer.stop(timeout_ms=600_000)
+        total = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "append_p50_us": statistics.median(latencies),
+        "append_p99_us": latencies[int(len(latencies) * 0.99)],
+        "total_s": total,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--interval-ms", type=int, default=100)
+    parser.add_argument("--modes", nargs="+", default=("off",) + DURABILITY_MODES,
+                        choices=("off",) + DURABILITY_MODES)
+    args = parser.parse_args()
+
+    print(f"{'mode':<10}{'append p50':>12}{'append p99':>12}{'commit all':>12}  loss window")
+    for mode in args.modes:
+        result = run_mode(mode, args.messages, args.interval_ms)
+        print(f"{mode:<10}{result['append_p50_us']:>10.1f}us{result['append_p99_us']:>10.1f}us"
+              f"{result['total_s']:>11.2f}s  "
+              f"{LOSS_WINDOW[mode].format(interval_ms=args.interval_ms)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Exercises ModelRouter against the local Mistral stub: first with both models
+healthy, then with the large model slowed down past the latency budget, and
+prints which model served each phase.
+
+    python -m benchmarks.bench_model_router --requests 40
+"""
+import argparse
+import os
+import sys
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PySide6 import QtCore as qtc
+from backend.agents.async_mistral import AsyncMistralBackend
+from backend.agents.model_router import LARGE_MODEL, SMALL_MODEL, ModelRouter, RoutingContext
+from benchmarks.mistral_stub import MistralStubServer
+
+
+class PerModelStub(MistralStubServer):
+    def __init__(self):
+        super().__init__()
+        self.delays = {SMALL_MODEL: 0.05, LARGE_MODEL: 0.2}
+
+    def delay_for(self, payload: dict) -> float:
+        return self.delays.get(payload.get("model"), self.delay)
+
+
+def run_phase(app, router: ModelRouter, backend: AsyncMistralBackend, stub: PerModelStub,
+              count: int) -> Counter:
+    first = len(stub.models)
+    done = []
+    for i in range(count):
+        # Alternate short and long prompts so both routing rules fire.
+        prompt = "hi" if i % 2 == 0 else "explain " * 100
+        model = router.choose(RoutingContext(prompt=prompt))
+        backend.submit(prompt, model=model)
+        # Sequential requests, so the tracker sees each result before the next choice.
+        target = len(done) + 1
+        backend.finished_signal.connect(done.append)
+        while len(done) < target:
+            app.processEvents(qtc.QEventLoop.AllEvents, 10)
+        backend.finished_signal.disconnect(done.append)
+    return Counter(stub.models[first:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--max-p95", type=float, default=0.5,
+                        help="Latency budget in seconds before traffic is shifted")
+    args = parser.parse_args()
+
+    app = qtc.QCoreApplication([])
+    with PerModelStub() as stub:
+        os.environ["MISTRAL_SERVER_URL"] = stub.url
+        os.environ.setdefault("MISTRAL_API_KEY", "stub")
+        os.environ["MYCHATBOT_MAX_P95_SECONDS"] = str(args.max_p95)
+
+        router = ModelRouter.from_env()
+        backend = AsyncMistralBackend(tracker=router.tracker)
+
+        print("healthy:      ", dict(run_phase(app, router, backend, stub, args.requests)))
+        stub.delays[LARGE_MODEL] = args.max_p95 * 2
+        print("large slowed: ", dict(run_phase(app, router, backend, stub, args.requests)))
+        for model in (SMALL_MODEL, LARGE_MODEL):
+            print(f"{model}: {router.tracker.stats(model)}")
+
+        backend.shutdown()
+
+
+if __name__ == "__main__":
+    main()
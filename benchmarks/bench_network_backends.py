@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Sends N concurrent prompts to a local Mistral stub through the QThread-per-request
+backend and the asyncio backend, and reports wall time and peak OS threads.
+
+    python -m benchmarks.bench_network_backends --requests 100 --delay 0.5
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PySide6 import QtCore as qtc
+from backend.agents.async_mistral import AsyncMistralBackend
+from backend.agents.mistral_agent import MistralWorker
+from benchmarks.mistral_stub import MistralStubServer
+
+
+def os_thread_count() -> int:
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("Threads:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return threading.active_count()
+
+
+def wait_for(app: qtc.QCoreApplication, done, total: int, peak: list):
+    while len(done) < total:
+        app.processEvents(qtc.QEventLoop.AllEvents, 10)
+        peak[0] = max(peak[0], os_thread_count())
+
+
+def run_threads(app, count: int) -> dict:
+    done, workers, peak = [], [], [os_thread_count()]
+    start = time.perf_counter()
+    for i in range(count):
+        worker = MistralWorker(f"prompt {i}")
+        worker.finished_signal.connect(lambda: done.append(1))
+        workers.append(worker)
+        worker.start()
+    wait_for(app, done, count, peak)
+    elapsed = time.perf_counter() - start
+    for worker in workers:
+        worker.wait()
+    return {"seconds": elapsed, "peak_threads": peak[0]}
+
+
+def run_asyncio(app, count: int) -> dict:
+    backend = AsyncMistralBackend(max_concurrency=count)
+    done, errors, peak = [], [], [os_thread_count()]
+    backend.finished_signal.connect(done.append)
+    backend.error_occurred.connect(lambda _, error: errors.append(error))
+    start = time.perf_counter()
+    for i in range(count):
+        backend.submit(f"prompt {i}")
+    wait_for(app, done, count, peak)
+    elapsed = time.perf_counter() - start
+    backend.shutdown()
+    if errors:
+        print(f"  first error: {errors[0]}")
+    return {"seconds": elapsed, "peak_threads": peak[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--delay", type=float, default=0.5,
+                        help="Simulated server latency per request in seconds")
+    args = parser.parse_args()
+
+    app = qtc.QCoreApplication([])
+    with MistralStubServer(delay=args.delay) as stub:
+        os.environ["MISTRAL_SERVER_URL"] = stub.url
+        os.environ.setdefault("MISTRAL_API_KEY", "stub")
+        print(f"baseline OS threads: {os_thread_count()}")
+        for name, runner in (("thread", run_threads), ("asyncio", run_asyncio)):
+            result = runner(app, args.requests)
+            print(f"{name:>8}: {result['seconds']:.2f}s for {args.requests} requests, "
+                  f"peak {result['peak_threads']} OS threads")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Lookup latency of the similar-prompt index at a large size. The index is
+filled with random signatures (uniformly spread over the buckets) plus a set
+of real prompts, then queried with paraphrases of those prompts.
+
+    python -m benchmarks.bench_similarity --rows 1000000
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+from backend.agents.dataset_agent import DatasetAgent
+from backend.storage.similarity import SIGNATURE_BITS, SimilarityIndex, signature
+
+SUBJECTS = ["a list", "a dict", "a string", "a csv file", "a json file", "a dataframe",
+            "a socket", "a thread", "a regex", "a sqlite table"]
+VERBS = ["reverse", "sort", "parse", "merge", "filter", "serialize", "split",
+         "copy", "compress", "validate"]
+
+
+def prompts():
+    for verb in VERBS:
+        for subject in SUBJECTS:
+            yield (f"How do I {verb} {subject} in python?",
+                   f"how can I {verb} {subject} with python")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = SimilarityIndex(DatasetAgent(os.path.join(tmp, "bench.db")))
+        rng = np.random.default_rng(0)
+        pairs = list(prompts())
+
+        started = time.perf_counter()
+        filler = args.rows - len(pairs)
+        index.add_signatures(
+            rng.integers(0, 256, size=(filler, SIGNATURE_BITS // 8), dtype=np.uint8),
+            np.arange(filler), np.arange(filler))
+        index.add_signatures(
+            np.stack([signature(prompt) for prompt, _ in pairs]),
+            np.arange(filler, args.rows), np.arange(filler, args.rows))
+        print(f"built {index.size} rows in {time.perf_counter() - started:.2f}s")
+
+        timings = []
+        hits = 0
+        for i in range(args.queries):
+            expected = filler + i % len(pairs)
+            started = time.perf_counter()
+            matches = index.nearest(pairs[i % len(pairs)][1])
+            timings.append((time.perf_counter() - started) * 1000)
+            hits += bool(matches) and matches[0][1] == expected
+
+        timings.sort()
+        print(f"lookup p50 {statistics.median(timings):.2f} ms, "
+              f"p95 {timings[int(len(timings) * 0.95)]:.2f} ms, "
+              f"paraphrase recall {hits / args.queries:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Measures compression ratio and read/write cost of the message storage codec
+for a range of thresholds, to help pick MYCHATBOT_COMPRESS_THRESHOLD.
+
+    python -m benchmarks.bench_storage_codec --messages 2000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.agents.dataset_agent import DatasetAgent
+from backend.models.message import Message
+from backend.storage.codec import COMPRESSORS, ContentCodec
+
+WORDS = ("the model returns a list of values that you can iterate over "
+         "and pass to the function below before writing results").split()
+
+CODE = '''```python
+def process(items):
+    results = []
+    for index, item in enumerate(items):
+        if item is None:
+            continue
+        results.append((index, item.strip().lower()))
+    return results
+```
+'''
+
+
+def synthetic_reply(rng: random.Random) -> str:
+    parts = []
+    for _ in range(rng.choice([1, 2, 4, 8, 16])):
+        parts.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(10, 60))))
+        if rng.random() < 0.6:
+            parts.append(CODE)
+    return "\n\n".join(parts)
+
+
+def run(codec_name: str, threshold: int, replies) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        codec = ContentCodec(COMPRESSORS[codec_name](), threshold=threshold)
+        agent = DatasetAgent(os.path.join(tmp, "bench.db"), codec=codec)
+
+        start = time.perf_counter()
+        for text in replies:
+            agent.log_message(Message(conversation_id="bench", sender_id="ai", content=text))
+        write_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        messages = agent.get_conversation_messages("bench")
+        read_s = time.perf_counter() - start
+        assert [m.content for m in messages] == list(replies)
+
+        stats = agent.storage_stats()
+        return {
+            "codec": codec_name,
+            "threshold": threshold,
+            "ratio": stats["ratio"],
+            "db_bytes": os.path.getsize(agent.db_path),
+            "write_ms_per_msg": write_s * 1000 / len(replies),
+            "read_ms_per_msg": read_s * 1000 / len(replies),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--codec", default="zlib", choices=sorted(COMPRESSORS))
+    parser.add_argument("--thresholds", default="0,256,1024,2048,8192")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    replies = [synthetic_reply(rng) for _ in range(args.messages)]
+
+    print(f"{'threshold':>10} {'ratio':>7} {'db KiB':>9} {'write ms':>9} {'read ms':>9}")
+    for threshold in (int(t) for t in args.thresholds.split(",")):
+        result = run(args.codec, threshold, replies)
+        print(f"{result['threshold']:>10} {result['ratio']:>7.2f} "
+              f"{result['db_bytes'] / 1024:>9.1f} {result['write_ms_per_msg']:>9.3f} "
+              f"{result['read_ms_per_msg']:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Times ChatMessageWidget construction with the shared application theme
+against the previous per-widget setStyleSheet() approach.
+
+    python -m benchmarks.bench_widget_creation --widgets 300
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PySide6 import QtWidgets as qtw
+from frontend import theme
+from frontend.components.chat_message import ChatMessageWidget
+
+REPLY = """Here is an example:
+
+```python
+def greet(name):
+    return f"Hello, {name}!"
+```
+
+It returns a **formatted** greeting.
+"""
+
+# The stylesheets each AI message used to set on its own children.
+LEGACY_LABEL_QSS = """
+    font-weight: bold;
+    font-size: 12px;
+    color: rgb(94,147,207);
+    margin-bottom: 2px;
+"""
+LEGACY_TEXT_EDIT_QSS = """
+    QTextEdit {
+        background-color: rgb(0,22,45);
+        border: 1px solid rgb(33,84,141);
+        border-radius: 12px;
+        padding: 12px;
+        font-size: 14px;
+        margin-bottom: 8px;
+        color: rgb(177,203,231);
+    }
+"""
+LEGACY_BUTTON_QSS = """
+    QPushButton {
+        padding: 4px 8px;
+        border: 1px solid rgb(33,84,141);
+        border-radius: 4px;
+        background-color: rgb(0,38,80);
+        font-size: 12px;
+        color: rgb(177,203,231);
+    }
+    QPushButton:hover {
+        background-color: rgb(94,147,207);
+    }
+"""
+
+
+def apply_legacy_styles(widget: ChatMessageWidget):
+    widget.findChild(qtw.QLabel, "senderLabel").setStyleSheet(LEGACY_LABEL_QSS)
+    widget.text_edit.setStyleSheet(LEGACY_TEXT_EDIT_QSS)
+    for button in (widget.copy_button, widget.save_md_button, widget.save_txt_button):
+        button.setStyleSheet(LEGACY_BUTTON_QSS)
+
+
+def run(app: qtw.QApplication, count: int, legacy: bool) -> float:
+    container = qtw.QWidget()
+    layout = qtw.QVBoxLayout(container)
+    container.show()
+
+    start = time.perf_counter()
+    for _ in range(count):
+        widget = ChatMessageWidget(REPLY, is_user=False)
+        if legacy:
+            apply_legacy_styles(widget)
+        layout.addWidget(widget)
+        # Polishing happens when the widget is shown; include it in the cost.
+        widget.ensurePolished()
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+
+    container.deleteLater()
+    app.processEvents()
+    return elapsed * 1000 / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--widgets", type=int, default=300)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    app = qtw.QApplication([])
+    theme.apply(app)
+
+    for label, legacy in (("per-widget stylesheets", True), ("shared theme", False)):
+        timings = [run(app, args.widgets, legacy) for _ in range(args.rounds)]
+        print(f"{label:>24}: {min(timings):.3f} ms/widget (best of {args.rounds})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Headless GUI benchmark suite for MainWindow and ChatMessageWidget.
+
+Runs on the offscreen Qt platform and writes a JSON report:
+
+    python -m benchmarks.gui_suite --output bench.json
+    python -m benchmarks.gui_suite --output bench.json --compare baseline.json
+
+With --compare, every metric is checked against the baseline and the run
+fails (exit status 1) when one is slower by more than --tolerance.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import time
+from pathlib import Path
+from statistics import median
+from typing import Callable, Dict, List, Tuple
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PySide6 import QtCore as qtc
+from PySide6 import QtGui as qtg
+from PySide6 import QtWidgets as qtw
+from frontend import theme
+from frontend.components.chat_message import ChatMessageWidget
+from frontend.components.code_highlighter import shared_highlighter
+from frontend.views.main_window import MainWindow
+
+History = List[Tuple[str, bool]]
+
+
+def short_chat(count: int = 200) -> History:
+    return [("How do I sort a dict by value?", True) if i % 2 == 0 else
+            ("Use `sorted(d.items(), key=lambda kv: kv[1])`.", False)
+            for i in range(count)]
+
+
+def giant_code_answers(count: int = 6, lines: int = 2000) -> History:
+    body = "\n".join(f"    result_{i} = compute({i}, factor=2.5)  # step {i}" for i in range(lines))
+    answer = f"Here is the module:\n\n```python\ndef main():\n{body}\n```\n"
+    history = []
+    for i in range(count):
+        history.append((f"Generate module {i}", True))
+        history.append((answer.replace("compute", f"compute_{i}"), False))
+    return history
+
+
+def long_session(count: int = 10000) -> History:
+    history = []
+    for i in range(count):
+        if i % 2 == 0:
+            history.append((f"Question {i}: what does this error mean?", True))
+        else:
+            history.append((f"Answer {i}: it means the key is missing.\n\n"
+                            "```python\nvalue = data.get('key', default)\n```\n" +
+                            "Some explanation. " * (i % 30), False))
+    return history
+
+
+SCENARIOS: Dict[str, Callable[[], History]] = {
+    "short_chat": short_chat,
+    "giant_code": giant_code_answers,
+    "10k_messages": long_session,
+}
+
+# Widget-level metrics use a sample so the 10k scenario stays bounded.
+WIDGET_SAMPLE = 200
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is a high-water mark (KiB on Linux, bytes on macOS).
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+
+
+def timed(fn: Callable, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+def flush_events(app: qtw.QApplication, rounds: int = 3):
+    for _ in range(rounds):
+        app.processEvents()
+
+
+def measure_widgets(app: qtw.QApplication, history: History) -> dict:
+    sample = history[:WIDGET_SAMPLE]
+    highlighter = shared_highlighter()
+
+    render = []
+    for message, _ in sample:
+        start = time.perf_counter()
+        html, _ = highlighter.render_markdown(message)
+        qtg.QTextDocument().setHtml(html)
+        render.append((time.perf_counter() - start) * 1000)
+
+    construct, adjust = [], []
+    container = qtw.QWidget()
+    layout = qtw.QVBoxLayout(container)
+    container.resize(800, 600)
+    container.show()
+    for message, is_user in sample:
+        start = time.perf_counter()
+        widget = ChatMessageWidget(message, is_user)
+        layout.addWidget(widget)
+        construct.append((time.perf_counter() - start) * 1000)
+    flush_events(app)
+    for i in range(layout.count()):
+        adjust.append(timed(layout.itemAt(i).widget().adjust_height))
+    container.deleteLater()
+    flush_events(app)
+
+    return {
+        "widget_construction_ms": median(construct),
+        "markdown_render_ms": median(render),
+        "adjust_height_ms": median(adjust),
+    }
+
+
+def measure_window(app: qtw.QApplication, history: History) -> dict:
+    window = MainWindow(controller=None)
+    window.resize(900, 700)
+    window.show()
+    flush_events(app)
+
+    done = []
+    window.history_loaded.connect(done.append)
+    start = time.perf_counter()
+    window.add_messages(history)
+    while not done:
+        app.processEvents()
+    flush_events(app)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    resize = []
+    for width in (700, 1100, 800, 1000):
+        start = time.perf_counter()
+        window.resize(width, 700)
+        flush_events(app)
+        resize.append((time.perf_counter() - start) * 1000)
+
+    scroll_bar = window.scroll_area.verticalScrollBar()
+    frames = []
+    steps = 60
+    for step in range(steps):
+        start = time.perf_counter()
+        scroll_bar.setValue(scroll_bar.maximum() - step * scroll_bar.maximum() // steps)
+        window.transcript.update_visibility()
+        window.scroll_area.viewport().repaint()
+        app.processEvents()
+        frames.append((time.perf_counter() - start) * 1000)
+
+    stats = window.transcript_stats()
+    window.close()
+    window.deleteLater()
+    flush_events(app)
+
+    frames.sort()
+    return {
+        "history_load_ms": load_ms,
+        "resize_relayout_ms": median(resize),
+        "scroll_frame_ms": median(frames),
+        "scroll_frame_p95_ms": frames[int(len(frames) * 0.95) - 1],
+        "live_widgets": stats["live_widgets"],
+    }
+
+
+def run_suite(scenarios: List[str]) -> dict:
+    app = qtw.QApplication.instance() or qtw.QApplication([])
+    theme.apply(app)
+
+    results = {}
+    for name in scenarios:
+        history = SCENARIOS[name]()
+        rss_before = rss_mb()
+        metrics = measure_widgets(app, history)
+        metrics.update(measure_window(app, history))
+        qtc.QThreadPool.globalInstance().waitForDone()
+        metrics["rss_growth_mb"] = rss_mb() - rss_before
+        results[name] = metrics
+        print(f"{name}: " + ", ".join(f"{k}={v:.2f}" for k, v in metrics.items()))
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "qt_platform": os.environ.get("QT_QPA_PLATFORM"),
+        },
+        "results": results,
+    }
+
+
+# Counts, not costs: excluded from regression checks.
+INFORMATIONAL = {"live_widgets"}
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> List[str]:
+    regressions = []
+    for scenario, metrics in current["results"].items():
+        for metric, value in metrics.items():
+            base = baseline.get("results", {}).get(scenario, {}).get(metric)
+            if base is None or metric in INFORMATIONAL:
+                continue
+            # Small absolute noise floor so near-zero metrics don't flap.
+            if value > base * (1 + tolerance) and value - base > 0.5:
+                regressions.append(
+                    f"{scenario}.{metric}: {value:.2f} vs baseline {base:.2f} "
+                    f"(+{(value / base - 1) * 100 if base else float('inf'):.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", default="gui_bench.json")
+    parser.add_argument("--compare", help="Baseline JSON produced by an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed slowdown before a metric counts as a regression")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help="Comma-separated subset of: " + ", ".join(SCENARIOS))
+    args = parser.parse_args()
+
+    report = run_suite([name for name in args.scenarios.split(",") if name])
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
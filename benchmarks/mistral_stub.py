@@ -0,0 +1,106 @@
+"""
+Minimal local stand-in for the Mistral chat completions endpoint.
+
+Point the app or a benchmark at it with MISTRAL_SERVER_URL=http://127.0.0.1:<port>.
+"""
+import asyncio
+import json
+import threading
+import time
+
+
+class MistralStubServer:
+    def __init__(self, delay: float = 0.2, host: str = "127.0.0.1", port: int = 0):
+        self.delay = delay
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self.models = []
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="mistral-stub", daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        self._thread.start()
+        self._ready.wait()
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+
+    async def _shutdown(self):
+        self._server.close()
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle, self.host, self.port))
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+
+    def delay_for(self, payload: dict) -> float:
+        return self.delay
+
+    def reply_for(self, payload: dict) -> str:
+        prompt = payload.get("messages", [{}])[-1].get("content", "")
+        return f"stub reply to: {prompt[:40]}"
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                header = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in header.decode("latin-1").split("\r\n"):
+                    name, _, value = line.partition(":")
+                    if name.lower() == "content-length":
+                        length = int(value.strip())
+                payload = json.loads(await reader.readexactly(length) or b"{}")
+
+                self.requests += 1
+                self.models.append(payload.get("model"))
+                await asyncio.sleep(self.delay_for(payload))
+
+                content = self.reply_for(payload)
+                body = json.dumps({
+                    "id": f"stub-{self.requests}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": payload.get("model", "stub"),
+                    "usage": {
+                        "prompt_tokens": len(json.dumps(payload.get("messages", []))) // 4,
+                        "completion_tokens": len(content) // 4,
+                        "total_tokens": 0,
+                    },
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }],
+                }).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"Content-Type: application/json\r\n"
+                    + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                    + body)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.CancelledError, ConnectionError):
+            pass
+        finally:
+            writer.close()
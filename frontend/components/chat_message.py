@@ -2,8 +2,9 @@ from PySide6 import QtWidgets as qtw
 from PySide6 import QtCore as qtc
 from PySide6 import QtGui as qtg
 from datetime import datetime
-import markdown
 import os
+from .. import theme
+from .code_highlighter import shared_highlighter
 
 class ChatMessageWidget(qtw.QWidget):
     def __init__(self, message: str, is_user: bool, attachments=None, parent=None):
@@ -11,6 +12,7 @@ class ChatMessageWidget(qtw.QWidget):
         self.message = message
         self.is_user = is_user
         self.attachments = attachments or []
+        self.pending_highlights = set()
         self.setup_ui()
 
     def setup_ui(self):
@@ -37,14 +39,8 @@ class ChatMessageWidget(qtw.QWidget):
 
         sender_label = qtw.QLabel("You" if self.is_user else "Mistral AI")
         sender_label.setAlignment(qtc.Qt.AlignLeft if self.is_user else qtc.Qt.AlignRight)
-        sender_label.setStyleSheet(
-            """
-            font-weight: bold;
-            font-size: 12px;
-            color: %s;
-            margin-bottom: 2px;
-            """ % ("rgb(177,203,231)" if self.is_user else "rgb(94,147,207)")
-        )
+        sender_label.setObjectName("senderLabel")
+        theme.set_role(sender_label, self.is_user)
         layout.addWidget(sender_label)
 
         self.text_edit = qtw.QTextEdit()
@@ -52,19 +48,8 @@ class ChatMessageWidget(qtw.QWidget):
         self.text_edit.setSizePolicy(qtw.QSizePolicy.Expanding, qtw.QSizePolicy.Preferred)
         self.text_edit.setHorizontalScrollBarPolicy(qtc.Qt.ScrollBarAlwaysOff)
         self.text_edit.setVerticalScrollBarPolicy(qtc.Qt.ScrollBarAlwaysOff)
-        self.text_edit.setStyleSheet(
-            f"""
-            QTextEdit {{
-                background-color: {'rgb(0,38,80)' if self.is_user else 'rgb(0,22,45)'};
-                border: 1px solid {'rgb(33,84,141)' if self.is_user else 'rgb(33,84,141)'};
-                border-radius: 12px;
-                padding: 12px;
-                font-size: 14px;
-                margin-bottom: 8px;
-                color: rgb(177,203,231);
-            }}
-            """
-        )
+        self.text_edit.setObjectName("messageBody")
+        theme.set_role(self.text_edit, self.is_user)
 
         if self.message:
             self.set_markdown_content(self.text_edit, self.message)
@@ -79,53 +64,17 @@ class ChatMessageWidget(qtw.QWidget):
             button_layout.setSpacing(5)
             
             self.copy_button = qtw.QPushButton("Copy")
-            self.copy_button.setStyleSheet("""
-                QPushButton {
-                    padding: 4px 8px;
-                    border: 1px solid rgb(33,84,141);
-                    border-radius: 4px;
-                    background-color: rgb(0,38,80);
-                    font-size: 12px;
-                    color: rgb(177,203,231);
-                }
-                QPushButton:hover {
-                    background-color: rgb(94,147,207);
-                }
-            """)
+            self.copy_button.setObjectName("messageAction")
             self.copy_button.clicked.connect(self.copy_markdown)
             button_layout.addWidget(self.copy_button)
             
             self.save_md_button = qtw.QPushButton("Save MD")
-            self.save_md_button.setStyleSheet("""
-                QPushButton {
-                    padding: 4px 8px;
-                    border: 1px solid rgb(33,84,141);
-                    border-radius: 4px;
-                    background-color: rgb(0,38,80);
-                    font-size: 12px;
-                    color: rgb(177,203,231);
-                }
-                QPushButton:hover {
-                    background-color: rgb(94,147,207);
-                }
-            """)
+            self.save_md_button.setObjectName("messageAction")
             self.save_md_button.clicked.connect(lambda: self.save_markdown('md'))
             button_layout.addWidget(self.save_md_button)
             
             self.save_txt_button = qtw.QPushButton("Save TXT")
-            self.save_txt_button.setStyleSheet("""
-                QPushButton {
-                    padding: 4px 8px;
-                    border: 1px solid rgb(33,84,141);
-                    border-radius: 4px;
-                    background-color: rgb(0,38,80);
-                    font-size: 12px;
-                    color: rgb(177,203,231);
-                }
-                QPushButton:hover {
-                    background-color: rgb(94,147,207);
-                }
-            """)
+            self.save_txt_button.setObjectName("messageAction")
             self.save_txt_button.clicked.connect(lambda: self.save_markdown('txt'))
             button_layout.addWidget(self.save_txt_button)
             
@@ -172,12 +121,32 @@ class ChatMessageWidget(qtw.QWidget):
         self.text_edit.setMaximumHeight(min(height, 500))
 
     def set_markdown_content(self, text_edit: qtw.QTextEdit, markdown_text: str):
-        html = markdown.markdown(markdown_text)
+        highlighter = shared_highlighter()
+        html, self.pending_highlights = highlighter.render_markdown(markdown_text)
+        if self.pending_highlights:
+            highlighter.block_ready.connect(self.on_highlight_ready)
+            # Blocks finished on the pool while rendering emitted block_ready
+            # before this connection existed.
+            self.pending_highlights = {key for key in self.pending_highlights
+                                       if highlighter.cached(key) is None}
+            if not self.pending_highlights:
+                highlighter.block_ready.disconnect(self.on_highlight_ready)
+                self.set_markdown_content(text_edit, markdown_text)
+                return
         doc = qtg.QTextDocument()
         doc.setHtml(html)
         text_edit.setDocument(doc)
         qtc.QTimer.singleShot(100, self.adjust_height)
 
+    def on_highlight_ready(self, key: str):
+        if key not in self.pending_highlights:
+            return
+        self.pending_highlights.discard(key)
+        if not self.pending_highlights:
+            shared_highlighter().block_ready.disconnect(self.on_highlight_ready)
+            # Every other block is already cached, so this only rebuilds HTML.
+            self.set_markdown_content(self.text_edit, self.message)
+
     def show_context_menu(self, position):
         menu = qtw.QMenu(self)
         
@@ -0,0 +1,242 @@
+import hashlib
+import html
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+from PySide6 import QtCore as qtc
+import markdown
+from .. import theme
+
+try:
+    from pygments import highlight as pygments_highlight
+    from pygments.formatters import HtmlFormatter
+    from pygments.lexers import get_lexer_by_name
+    from pygments.util import ClassNotFound
+except ImportError:
+    pygments_highlight = None
+
+FENCE_RE = re.compile(r"^(?P<fence>```|~~~)[ \t]*(?P<lang>[\w+#.-]*)[^\n]*\n(?P<code>.*?)^(?P=fence)[ \t]*$",
+                      re.M | re.S)
+
+# Blocks up to this many lines are lexed inline; bigger ones go to the thread pool.
+INLINE_LINE_LIMIT = 150
+CACHE_SIZE = 512
+
+KEYWORDS = {
+    "python": """and as assert async await break class continue def del elif else except
+        False finally for from global if import in is lambda None nonlocal not or pass
+        raise return True try while with yield self""",
+    "javascript": """async await break case catch class const continue default delete do else
+        export extends false finally for function if import in instanceof let new null
+        return super switch this throw true try typeof undefined var void while yield""",
+    "c": """auto break case char const continue default do double else enum extern float
+        for goto if int long register return short signed sizeof static struct switch
+        typedef union unsigned void volatile while bool true false class public private
+        protected new delete namespace template this virtual package import interface
+        extends implements final func go defer chan map type var fn let mut impl trait
+        pub use match mod struct enum loop""",
+    "bash": """if then else elif fi for while do done case esac function in return export
+        local echo exit""",
+    "sql": """select from where and or not insert into values update set delete create table
+        index on join left right inner outer group by order having limit as distinct
+        primary key foreign references null is in like between union all""",
+}
+ALIASES = {
+    "py": "python", "python3": "python", "js": "javascript", "ts": "javascript",
+    "typescript": "javascript", "jsx": "javascript", "tsx": "javascript", "json": "javascript",
+    "cpp": "c", "c++": "c", "h": "c", "java": "c", "cs": "c", "csharp": "c", "go": "c",
+    "rust": "c", "rs": "c", "kotlin": "c", "swift": "c",
+    "sh": "bash", "shell": "bash", "zsh": "bash", "console": "bash",
+}
+HASH_COMMENT_LANGUAGES = {"python", "bash"}
+
+TOKEN_RE = {
+    style: re.compile(
+        r"(?P<comment>%s)"
+        r"|(?P<string>\"\"\".*?\"\"\"|'''.*?'''|\"(?:\\.|[^\"\\\n])*\"|'(?:\\.|[^'\\\n])*'|`(?:\\.|[^`\\])*`)"
+        r"|(?P<number>\b\d+(?:\.\d+)?\b)"
+        r"|(?P<word>\b[A-Za-z_]\w*\b)" % comment,
+        re.S
+    )
+    for style, comment in (
+        ("hash", r"#[^\n]*"),
+        ("slash", r"//[^\n]*|/\*.*?\*/"),
+        ("sql", r"--[^\n]*"),
+        ("generic", r"#[^\n]*|//[^\n]*"),
+    )
+}
+
+
+def _normalize_language(lang: str) -> str:
+    lang = (lang or "").lower()
+    return ALIASES.get(lang, lang)
+
+
+def _span(color: str, text: str, italic: bool = False) -> str:
+    style = f"color:{color};" + ("font-style:italic;" if italic else "")
+    return f'<span style="{style}">{html.escape(text)}</span>'
+
+
+def _simple_highlight(lang: str, code: str) -> str:
+    lang = _normalize_language(lang)
+    keywords = set(KEYWORDS.get(lang, "").split())
+    case_insensitive = lang == "sql"
+    if lang in HASH_COMMENT_LANGUAGES:
+        token_re = TOKEN_RE["hash"]
+    elif lang == "sql":
+        token_re = TOKEN_RE["sql"]
+    elif lang in KEYWORDS:
+        token_re = TOKEN_RE["slash"]
+    else:
+        token_re = TOKEN_RE["generic"]
+
+    parts = []
+    position = 0
+    for match in token_re.finditer(code):
+        parts.append(html.escape(code[position:match.start()]))
+        kind, text = match.lastgroup, match.group()
+        if kind == "comment":
+            parts.append(_span(theme.CODE_COMMENT, text, italic=True))
+        elif kind == "string":
+            parts.append(_span(theme.CODE_STRING, text))
+        elif kind == "number":
+            parts.append(_span(theme.CODE_NUMBER, text))
+        elif (text.lower() if case_insensitive else text) in keywords:
+            parts.append(_span(theme.CODE_KEYWORD, text))
+        else:
+            parts.append(html.escape(text))
+        position = match.end()
+    parts.append(html.escape(code[position:]))
+    return "".join(parts)
+
+
+def _pygments_highlight(lang: str, code: str) -> Optional[str]:
+    try:
+        lexer = get_lexer_by_name(lang)
+    except ClassNotFound:
+        return None
+    formatter = HtmlFormatter(nowrap=True, noclasses=True, style="native")
+    return pygments_highlight(code, lexer, formatter)
+
+
+def highlight_code(lang: str, code: str) -> str:
+    highlighted = None
+    if pygments_highlight is not None and lang:
+        highlighted = _pygments_highlight(lang, code)
+    if highlighted is None:
+        highlighted = _simple_highlight(lang, code)
+    return (f'<pre style="background-color:{theme.CODE_BACKGROUND}; color:{theme.CODE_TEXT};">'
+            f'{highlighted}</pre>')
+
+
+def plain_code(code: str) -> str:
+    return (f'<pre style="background-color:{theme.CODE_BACKGROUND}; color:{theme.CODE_TEXT};">'
+            f'{html.escape(code)}</pre>')
+
+
+def block_key(lang: str, code: str) -> str:
+    digest = hashlib.sha1(code.encode("utf-8")).hexdigest()
+    return f"{_normalize_language(lang)}:{digest}"
+
+
+class _HighlightTask(qtc.QRunnable):
+    def __init__(self, highlighter: "CodeHighlighter", key: str, lang: str, code: str):
+        super().__init__()
+        self.highlighter = highlighter
+        self.key = key
+        self.lang = lang
+        self.code = code
+
+    def run(self):
+        self.highlighter._store(self.key, highlight_code(self.lang, self.code))
+
+
+class CodeHighlighter(qtc.QObject):
+    """Highlights fenced code blocks one block at a time.
+
+    Results are cached per (language, code hash), so re-rendering a message
+    only lexes blocks whose text changed. Blocks larger than
+    INLINE_LINE_LIMIT lines are lexed on the global thread pool and
+    ``block_ready`` fires with the block key once they are cached.
+    """
+
+    block_ready = qtc.Signal(str)
+
+    def __init__(self, cache_size: int = CACHE_SIZE, parent=None):
+        super().__init__(parent)
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._in_flight: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def _cache_put(self, key: str, highlighted: str):
+        # Caller holds self._lock.
+        self._cache[key] = highlighted
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _store(self, key: str, highlighted: str):
+        with self._lock:
+            self._cache_put(key, highlighted)
+            self._in_flight.discard(key)
+        self.block_ready.emit(key)
+
+    def cached(self, key: str) -> Optional[str]:
+        with self._lock:
+            highlighted = self._cache.get(key)
+            if highlighted is not None:
+                self._cache.move_to_end(key)
+            return highlighted
+
+    def request(self, lang: str, code: str) -> Tuple[str, Optional[str]]:
+        key = block_key(lang, code)
+        highlighted = self.cached(key)
+        if highlighted is not None:
+            return key, highlighted
+
+        if code.count("\n") < INLINE_LINE_LIMIT:
+            highlighted = highlight_code(lang, code)
+            with self._lock:
+                self._cache_put(key, highlighted)
+            return key, highlighted
+
+        with self._lock:
+            scheduled = key in self._in_flight
+            self._in_flight.add(key)
+        if not scheduled:
+            qtc.QThreadPool.globalInstance().start(_HighlightTask(self, key, lang, code))
+        return key, None
+
+    def render_markdown(self, markdown_text: str) -> Tuple[str, Set[str]]:
+        """Render markdown to HTML, returning the keys still being highlighted.
+
+        Pending blocks are rendered as plain preformatted text until ready.
+        """
+        blocks: Dict[str, str] = {}
+        pending: Set[str] = set()
+
+        def replace(match) -> str:
+            key, highlighted = self.request(match.group("lang"), match.group("code"))
+            if highlighted is None:
+                pending.add(key)
+                highlighted = plain_code(match.group("code"))
+            token = f"CODEBLOCK{len(blocks)}X"
+            blocks[token] = highlighted
+            return f"\n\n{token}\n\n"
+
+        html_text = markdown.markdown(FENCE_RE.sub(replace, markdown_text))
+        for token, highlighted in blocks.items():
+            html_text = html_text.replace(f"<p>{token}</p>", highlighted)
+        return html_text, pending
+
+
+_instance: Optional[CodeHighlighter] = None
+
+
+def shared_highlighter() -> CodeHighlighter:
+    global _instance
+    if _instance is None:
+        _instance = CodeHighlighter(parent=qtc.QCoreApplication.instance())
+    return _instance
@@ -0,0 +1,59 @@
+from PySide6 import QtWidgets as qtw
+from PySide6 import QtCore as qtc
+
+class DiagnosticsPanel(qtw.QDockWidget):
+    def __init__(self, sampler, parent=None):
+        super().__init__("Diagnostics", parent)
+        self.sampler = sampler
+        self.setObjectName("diagnosticsPanel")
+        self.setup_ui()
+        self.sampler.sample_ready.connect(self.show_sample)
+        if self.sampler.last_sample:
+            self.show_sample(self.sampler.last_sample)
+
+    def setup_ui(self):
+        container = qtw.QWidget()
+        layout = qtw.QVBoxLayout()
+        layout.setContentsMargins(6, 6, 6, 6)
+        container.setLayout(layout)
+
+        self.sample_button = qtw.QPushButton("Sample now")
+        self.sample_button.clicked.connect(self.sampler.sample)
+        layout.addWidget(self.sample_button)
+
+        self.output = qtw.QPlainTextEdit()
+        self.output.setReadOnly(True)
+        self.output.setLineWrapMode(qtw.QPlainTextEdit.NoWrap)
+        layout.addWidget(self.output)
+
+        self.setWidget(container)
+
+    def show_sample(self, sample: dict):
+        threads = sample["threads"]
+        connections = sample["sqlite_connections"]
+        lines = [
+            f"{sample['time']}  (sampled in {sample['sample_ms']} ms)",
+            f"RSS: {sample['rss_mb'] or 0:.1f} MiB   traced: {sample['traced_mb']} MiB "
+            f"(peak {sample['traced_peak_mb']} MiB)",
+            f"Threads: {threads['python']} python, {threads['os']} OS, "
+            f"{threads['qt_pool_active']} active in Qt pool",
+            f"SQLite connections: {connections['open']} open, {connections['opened_total']} opened",
+            f"QObjects: {sample['qobjects_total']}",
+        ]
+        lines += [f"  {count:>6}  {name}" for name, count in sample["qobjects"].items()]
+
+        if sample["qobject_growth"]:
+            lines.append("QObject change since last sample:")
+            lines += [f"  {delta:>+6}  {name}" for name, delta in sample["qobject_growth"].items()]
+
+        if sample["memory_growth"]:
+            lines.append("Top allocation growth since last sample:")
+            lines += [f"  {item['size_diff_kib']:>+9.1f} KiB  {item['count_diff']:>+6}  {item['source']}"
+                      for item in sample["memory_growth"]]
+
+        for key, value in sample.items():
+            if isinstance(value, dict) and key not in (
+                    "threads", "sqlite_connections", "qobjects", "qobject_growth"):
+                lines.append(f"{key}: " + ", ".join(f"{k}={v}" for k, v in value.items()))
+
+        self.output.setPlainText("\n".join(lines))
@@ -15,11 +15,7 @@ class LoadingWidget(qtw.QWidget):
         self.setLayout(layout)
 
         self.loading_label = qtw.QLabel("Mistral AI is thinking...")
-        self.loading_label.setStyleSheet("""
-            color: rgb(94,147,207);
-            font-style: italic;
-            font-size: 14px;
-        """)
+        self.loading_label.setObjectName("loadingLabel")
         layout.addWidget(self.loading_label)
 
         self.spinner = qtw.QLabel()
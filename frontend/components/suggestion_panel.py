@@ -0,0 +1,82 @@
+from PySide6 import QtWidgets as qtw
+from PySide6 import QtCore as qtc
+
+class SuggestionPanel(qtw.QFrame):
+    # (query, exchange id or "" for unsent text, suggestion)
+    answer_chosen = qtc.Signal(str, str, object)
+
+    def __init__(self, max_preview: int = 240, parent=None):
+        super().__init__(parent)
+        self.setObjectName("suggestionPanel")
+        self.max_preview = max_preview
+        self.query = ""
+        self.exchange_id = ""
+        self.setup_ui()
+        self.hide()
+
+    def setup_ui(self):
+        layout = qtw.QVBoxLayout()
+        layout.setContentsMargins(8, 6, 8, 6)
+        layout.setSpacing(4)
+        self.setLayout(layout)
+
+        header = qtw.QHBoxLayout()
+        title = qtw.QLabel("Similar past answers")
+        title.setObjectName("suggestionTitle")
+        header.addWidget(title)
+        header.addStretch()
+
+        dismiss_button = qtw.QPushButton("Dismiss")
+        dismiss_button.setObjectName("messageAction")
+        dismiss_button.clicked.connect(self.clear)
+        header.addWidget(dismiss_button)
+        layout.addLayout(header)
+
+        self.rows = qtw.QVBoxLayout()
+        self.rows.setSpacing(4)
+        layout.addLayout(self.rows)
+
+    def preview(self, text: str) -> str:
+        text = " ".join(text.split())
+        if len(text) > self.max_preview:
+            return text[:self.max_preview] + "…"
+        return text
+
+    def show_suggestions(self, query: str, exchange_id: str, suggestions: list):
+        self.clear()
+        if not suggestions:
+            return
+        self.query = query
+        self.exchange_id = exchange_id
+
+        for suggestion in suggestions:
+            row = qtw.QHBoxLayout()
+            label = qtw.QLabel(
+                f"<b>{suggestion.score:.0%}</b> {self.preview(suggestion.prompt).replace('<', '&lt;')}"
+                f"<br>{self.preview(suggestion.answer).replace('<', '&lt;')}"
+            )
+            label.setObjectName("suggestionText")
+            label.setWordWrap(True)
+            label.setTextFormat(qtc.Qt.RichText)
+            row.addWidget(label, 1)
+
+            use_button = qtw.QPushButton("Use answer")
+            use_button.setObjectName("messageAction")
+            use_button.clicked.connect(
+                lambda _=False, s=suggestion: self.answer_chosen.emit(self.query, self.exchange_id, s))
+            row.addWidget(use_button, 0, qtc.Qt.AlignTop)
+            self.rows.addLayout(row)
+
+        self.show()
+
+    def clear(self):
+        self.query = ""
+        self.exchange_id = ""
+        while self.rows.count():
+            row = self.rows.takeAt(0).layout()
+            while row.count():
+                widget = row.takeAt(0).widget()
+                if widget is not None:
+                    widget.deleteLater()
+            row.deleteLater()
+        self.hide()
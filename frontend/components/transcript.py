@@ -0,0 +1,261 @@
+import math
+import time
+from bisect import bisect_left, bisect_right
+from collections import deque
+from typing import Iterable, List, Optional
+from PySide6 import QtWidgets as qtw
+from PySide6 import QtCore as qtc
+from PySide6 import QtGui as qtg
+from .chat_message import ChatMessageWidget
+
+# Rough per-object costs used for the memory estimate in TranscriptManager.stats().
+# A live message owns a QTextEdit, its QTextDocument layout, a layout and up to
+# three buttons; a placeholder is a bare QWidget plus the Python-side text.
+LIVE_WIDGET_OVERHEAD = 48 * 1024
+LIVE_BYTES_PER_CHAR = 24
+PLACEHOLDER_OVERHEAD = 1024
+
+# Mirrors ChatMessageWidget: the text box is capped at 500px and the sender
+# label, margins and action buttons add roughly this much around it.
+MAX_BODY_HEIGHT = 500
+MESSAGE_CHROME_HEIGHT = 90
+
+
+class MessagePlaceholder(qtw.QWidget):
+    def __init__(self, message_id: int, height: int, parent=None):
+        super().__init__(parent)
+        self.message_id = message_id
+        self.setFixedHeight(max(height, 1))
+
+
+class TranscriptEntry:
+    __slots__ = ("message_id", "message", "is_user", "attachments", "widget", "height")
+
+    def __init__(self, message_id: int, message: str, is_user: bool, attachments=None):
+        self.message_id = message_id
+        self.message = message
+        self.is_user = is_user
+        self.attachments = attachments or []
+        self.widget: Optional[qtw.QWidget] = None
+        self.height = 0
+
+    @property
+    def is_live(self) -> bool:
+        return isinstance(self.widget, ChatMessageWidget)
+
+
+class TranscriptManager(qtc.QObject):
+    """Keeps only the message widgets near the viewport alive.
+
+    Messages further than ``margin_screens`` viewport heights away are swapped
+    for fixed-height placeholders and rebuilt when scrolled back into range.
+    """
+
+    stats_changed = qtc.Signal(dict)
+    bulk_finished = qtc.Signal(int)
+
+    def __init__(self, scroll_area: qtw.QScrollArea, layout: qtw.QVBoxLayout,
+                 margin_screens: float = 2.0, parent=None):
+        super().__init__(parent)
+        self.scroll_area = scroll_area
+        self.layout = layout
+        self.margin_screens = margin_screens
+        self.entries: List[TranscriptEntry] = []
+        self._live = set()
+        self._text_bytes = 0
+        self._next_id = 0
+        self._pending = deque()
+        self._pending_count = 0
+        self._time_slice = 0.012
+
+        self._bulk_timer = qtc.QTimer(self)
+        self._bulk_timer.setSingleShot(True)
+        self._bulk_timer.setInterval(0)
+        self._bulk_timer.timeout.connect(self._process_pending)
+
+        self._update_timer = qtc.QTimer(self)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(30)
+        self._update_timer.timeout.connect(self.update_visibility)
+
+        self.scroll_area.verticalScrollBar().valueChanged.connect(self.schedule_update)
+        self.scroll_area.verticalScrollBar().rangeChanged.connect(self.schedule_update)
+
+    def _new_entry(self, message: str, is_user: bool, attachments=None) -> TranscriptEntry:
+        entry = TranscriptEntry(self._next_id, message, is_user, attachments)
+        self._next_id += 1
+        self._text_bytes += len(message)
+        return entry
+
+    def append(self, message: str, is_user: bool, attachments=None) -> ChatMessageWidget:
+        if self._pending:
+            # Keep ordering: a live message never overtakes an unfinished bulk insert.
+            self._process_pending(drain=True)
+
+        entry = self._new_entry(message, is_user, attachments)
+        entry.widget = self._build_widget(entry)
+        self.entries.append(entry)
+        self._live.add(len(self.entries) - 1)
+        self._insert_widget(entry.widget)
+        self.schedule_update()
+        return entry.widget
+
+    def extend(self, messages: Iterable, time_slice_ms: int = 12):
+        """Insert many ``(message, is_user[, attachments])`` items at once.
+
+        Work is split into time slices so the event loop keeps running. Only
+        the messages that will end up near the bottom of the viewport get real
+        widgets; the rest start as placeholders sized from an estimate. The
+        container repaints, lays out and scrolls once, after the last slice.
+        """
+        items = [tuple(item) for item in messages]
+        if not items:
+            self.bulk_finished.emit(0)
+            return
+
+        live_from = self._live_tail_start(items)
+        for index, item in enumerate(items):
+            self._pending.append((item, index >= live_from))
+        self._pending_count += len(items)
+        self._time_slice = time_slice_ms / 1000
+
+        self.layout.parentWidget().setUpdatesEnabled(False)
+        self._bulk_timer.start()
+
+    def _estimate_height(self, message: str) -> int:
+        metrics = qtg.QFontMetrics(self.layout.parentWidget().font())
+        width = max(self.scroll_area.viewport().width() - 80, 100)
+        chars_per_line = max(width // max(metrics.averageCharWidth(), 1), 20)
+        lines = sum(max(1, math.ceil(len(line) / chars_per_line))
+                    for line in message.splitlines() or [""])
+        body = min(lines * metrics.lineSpacing() + 30, MAX_BODY_HEIGHT)
+        return body + MESSAGE_CHROME_HEIGHT
+
+    def _live_tail_start(self, items: List[tuple]) -> int:
+        viewport_height = self.scroll_area.viewport().height()
+        budget = viewport_height * (1 + self.margin_screens)
+        index = len(items)
+        while index > 0 and budget > 0:
+            index -= 1
+            budget -= self._estimate_height(items[index][0])
+        return index
+
+    def _process_pending(self, drain: bool = False):
+        deadline = None if drain else time.perf_counter() + self._time_slice
+
+        while self._pending:
+            (message, is_user, *rest), live = self._pending.popleft()
+            entry = self._new_entry(message, is_user, rest[0] if rest else None)
+            if live:
+                entry.widget = self._build_widget(entry)
+                self._live.add(len(self.entries))
+            else:
+                entry.height = self._estimate_height(message)
+                entry.widget = MessagePlaceholder(entry.message_id, entry.height)
+            self.entries.append(entry)
+            self._insert_widget(entry.widget)
+
+            if deadline is not None and time.perf_counter() >= deadline:
+                self._bulk_timer.start()
+                return
+
+        self._finish_bulk()
+
+    def _finish_bulk(self):
+        count = self._pending_count
+        self._pending_count = 0
+        container = self.layout.parentWidget()
+        container.setUpdatesEnabled(True)
+        self.layout.activate()
+        qtc.QTimer.singleShot(0, self._scroll_to_bottom_and_update)
+        self.bulk_finished.emit(count)
+
+    def _scroll_to_bottom_and_update(self):
+        scroll_bar = self.scroll_area.verticalScrollBar()
+        scroll_bar.setValue(scroll_bar.maximum())
+        self.update_visibility()
+
+    @property
+    def is_inserting(self) -> bool:
+        return bool(self._pending)
+
+    def _build_widget(self, entry: TranscriptEntry) -> ChatMessageWidget:
+        widget = ChatMessageWidget(entry.message, entry.is_user, entry.attachments)
+        widget.message_id = entry.message_id
+        return widget
+
+    def _insert_widget(self, widget: qtw.QWidget):
+        # Messages go before anything trailing the transcript (e.g. the loading indicator).
+        index = self.layout.count()
+        while index > 0:
+            item = self.layout.itemAt(index - 1).widget()
+            if isinstance(item, (ChatMessageWidget, MessagePlaceholder)):
+                break
+            index -= 1
+        self.layout.insertWidget(index, widget)
+
+    def _swap(self, entry: TranscriptEntry, replacement: qtw.QWidget):
+        old = entry.widget
+        self.layout.replaceWidget(old, replacement)
+        entry.widget = replacement
+        old.hide()
+        old.deleteLater()
+
+    def evict(self, entry: TranscriptEntry):
+        if not entry.is_live:
+            return
+        entry.height = entry.widget.height()
+        self._swap(entry, MessagePlaceholder(entry.message_id, entry.height))
+
+    def rehydrate(self, entry: TranscriptEntry):
+        if entry.is_live:
+            return
+        widget = self._build_widget(entry)
+        if entry.height:
+            widget.resize(widget.width(), entry.height)
+        self._swap(entry, widget)
+        widget.show()
+
+    def schedule_update(self, *args):
+        self._update_timer.start()
+
+    def _keep_range(self):
+        scroll_bar = self.scroll_area.verticalScrollBar()
+        viewport_height = self.scroll_area.viewport().height()
+        margin = int(viewport_height * self.margin_screens)
+        top = scroll_bar.value() - margin
+        bottom = scroll_bar.value() + viewport_height + margin
+
+        # Entries are laid out top to bottom, so positions are sorted.
+        first = bisect_left(self.entries, top,
+                            key=lambda entry: entry.widget.y() + entry.widget.height())
+        last = bisect_right(self.entries, bottom, key=lambda entry: entry.widget.y())
+        return first, last
+
+    def update_visibility(self):
+        if not self.entries or self._pending:
+            return
+
+        first, last = self._keep_range()
+        keep = set(range(first, last))
+        for index in self._live - keep:
+            self.evict(self.entries[index])
+        for index in keep - self._live:
+            self.rehydrate(self.entries[index])
+        self._live = keep
+        self.stats_changed.emit(self.stats())
+
+    def stats(self) -> dict:
+        live = [self.entries[index] for index in self._live]
+        placeholders = len(self.entries) - len(live)
+        estimated = sum(
+            LIVE_WIDGET_OVERHEAD + LIVE_BYTES_PER_CHAR * entry.widget.text_edit.document().characterCount()
+            for entry in live
+        )
+        estimated += placeholders * PLACEHOLDER_OVERHEAD + self._text_bytes
+        return {
+            "messages": len(self.entries),
+            "live_widgets": len(live),
+            "placeholders": placeholders,
+            "estimated_bytes": estimated,
+        }
@@ -0,0 +1,178 @@
+from PySide6 import QtCore as qtc
+from collections import deque
+import time
+from backend.agents.async_mistral import AsyncMistralBackend
+from backend.agents.mistral_agent import close_shared_clients
+from backend.agents.model_router import ModelRouter
+from backend.config import env_bool, env_float, env_int, env_str
+from backend.agents.dataset_agent import DatasetAgent, DatasetAgentWorker, DatasetWriter
+from backend.models.profile import Profile
+from backend.storage import similarity
+from backend.storage.journal import MessageJournal
+from backend.storage.similarity import SimilarityIndex
+from ..diagnostics import track_qobject
+
+class SimilarityIndexLoader(qtc.QThread):
+    index_ready = qtc.Signal(int)
+    error_occurred = qtc.Signal(str)
+
+    def __init__(self, index: SimilarityIndex, parent=None):
+        super().__init__(parent)
+        self.index = index
+
+    def run(self):
+        try:
+            self.index.open(cancelled=self.isInterruptionRequested)
+            if self.index.ready:
+                self.index.save()
+                self.index_ready.emit(self.index.size)
+        except Exception as e:
+            self.error_occurred.emit(f"Similarity index error: {str(e)}")
+
+class AppServices(qtc.QObject):
+    """Resources shared by every conversation tab.
+
+    One router/latency tracker, one network backend, one dataset writer and
+    one pair of profiles, so opening more tabs does not open more database
+    connections or more concurrent requests than MYCHATBOT_MAX_CONCURRENT_REQUESTS.
+    """
+
+    profiles_ready = qtc.Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.user_profile = None
+        self.ai_profile = None
+        self.worker_threads = []
+        self.queued_workers = deque()
+        self.max_concurrent_requests = max(
+            1, env_int("MYCHATBOT_MAX_CONCURRENT_REQUESTS", 64))
+        self.router = ModelRouter.from_env()
+        self.network_backend = None
+
+        if env_str("MYCHATBOT_NETWORK_BACKEND", "thread") == "asyncio":
+            self.network_backend = AsyncMistralBackend(
+                max_concurrency=self.max_concurrent_requests,
+                tracker=self.router.tracker,
+                parent=self
+            )
+
+        self.is_shut_down = False
+        self.dataset_writer = DatasetWriter(journal=MessageJournal.from_env(), parent=self)
+        self.dataset_writer.error_occurred.connect(
+            lambda error: print(f"Error logging message: {error}"))
+        self.dataset_writer.start()
+
+        self.similarity_index = None
+        self.similarity_loader = None
+        if similarity.available() and env_bool("MYCHATBOT_SIMILAR_ANSWERS", True):
+            self.init_similarity_index()
+
+        self.init_profiles()
+
+    def init_profiles(self):
+        user_worker = DatasetAgentWorker(entity_type='user')
+        track_qobject(user_worker)
+        user_worker.profile_ready.connect(self.set_user_profile)
+        user_worker.error_occurred.connect(
+            lambda e: print(f"Error getting user profile: {e}"))
+        user_worker.finished_signal.connect(self.cleanup_threads)
+        self.worker_threads.append(user_worker)
+        user_worker.start()
+        
+        ai_worker = DatasetAgentWorker(entity_type='ai')
+        track_qobject(ai_worker)
+        ai_worker.profile_ready.connect(self.set_ai_profile)
+        ai_worker.error_occurred.connect(
+            lambda e: print(f"Error getting AI profile: {e}"))
+        ai_worker.finished_signal.connect(self.cleanup_threads)
+        self.worker_threads.append(ai_worker)
+        ai_worker.start()
+
+    def init_similarity_index(self):
+        self.similarity_index = SimilarityIndex(
+            DatasetAgent(),
+            min_score=env_float("MYCHATBOT_SIMILAR_MIN_SCORE", 0.65)
+        )
+        # Registered before loading: writes that land during the catch-up
+        # scan are held by the index and applied once it is ready.
+        self.dataset_writer.add_listener(self.similarity_index.add_messages)
+        self.similarity_loader = SimilarityIndexLoader(self.similarity_index, parent=self)
+        self.similarity_loader.index_ready.connect(
+            lambda size: print(f"Similarity index ready: {size} prompts"))
+        self.similarity_loader.error_occurred.connect(print)
+        self.similarity_loader.start()
+
+    def find_similar(self, text: str, limit: int = 3) -> list:
+        if self.similarity_index is None:
+            return []
+        return self.similarity_index.find(text, limit)
+
+    def set_user_profile(self, profile: Profile):
+        self.user_profile = profile
+        print(f"User profile set: {profile.id}")
+        if self.ai_profile:
+            self.profiles_ready.emit()
+
+    def set_ai_profile(self, profile: Profile):
+        self.ai_profile = profile
+        print(f"AI profile set: {profile.id}")
+        if self.user_profile:
+            self.profiles_ready.emit()
+
+    def start_worker(self, worker: qtc.QThread):
+        # Thread-backend requests from all tabs share one budget; anything
+        # over it waits here instead of spawning another thread.
+        worker.finished.connect(lambda w=worker: self.release_worker(w))
+        self.queued_workers.append(worker)
+        self.start_queued_workers()
+
+    def start_queued_workers(self):
+        while self.queued_workers and len(self.worker_threads) < self.max_concurrent_requests:
+            worker = self.queued_workers.popleft()
+            self.worker_threads.append(worker)
+            worker.start()
+
+    def cancel_worker(self, worker: qtc.QThread):
+        if worker in self.queued_workers:
+            self.queued_workers.remove(worker)
+
+    def release_worker(self, worker: qtc.QThread):
+        if worker in self.worker_threads:
+            self.worker_threads.remove(worker)
+        self.start_queued_workers()
+
+    def cleanup_threads(self):
+        self.worker_threads = [t for t in self.worker_threads if t.isRunning()]
+        self.start_queued_workers()
+
+    def in_flight(self) -> int:
+        if self.network_backend is not None:
+            return self.network_backend.in_flight
+        return len(self.worker_threads) + len(self.queued_workers)
+
+    def shutdown(self, timeout_ms: int = 5000):
+        # Called from MainWindow.closeEvent and again from aboutToQuit.
+        if self.is_shut_down:
+            return
+        self.is_shut_down = True
+
+        self.queued_workers.clear()
+        if self.network_backend is not None:
+            self.network_backend.shutdown()
+        # Let running requests and profile lookups finish (their results are
+        # ignored by closed tabs) so no QThread is destroyed while running.
+        # Anything they still log is in the journal either way.
+        deadline = time.monotonic() + timeout_ms / 1000
+        finished = [thread.wait(max(int((deadline - time.monotonic()) * 1000), 0))
+                    for thread in list(self.worker_threads)]
+        # A worker still running past the deadline may be using the shared
+        # HTTP pool; the process exit releases it in that case.
+        if all(finished):
+            close_shared_clients()
+        if self.similarity_loader is not None:
+            self.similarity_loader.requestInterruption()
+            self.similarity_loader.wait()
+        self.dataset_writer.stop()
+        if self.similarity_index is not None and self.similarity_index.ready:
+            self.similarity_index.save()
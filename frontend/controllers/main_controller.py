@@ -1,11 +1,16 @@
 from PySide6 import QtCore as qtc
 from pathlib import Path
 import base64
+import time
 import uuid
 from backend.agents.mistral_agent import MistralWorker
-from backend.agents.dataset_agent import DatasetAgentWorker
+from backend.agents.model_router import RoutingContext
+from backend.config import env_str
 from backend.models.message import Message
-from backend.models.profile import Profile
+from backend.models.request_timing import RequestTiming
+from backend.models.usage import Usage
+from ..diagnostics import track_qobject
+from .app_services import AppServices
 
 class MainController(qtc.QObject):
     display_user_message = qtc.Signal(str, list) 
@@ -16,51 +21,64 @@ class MainController(qtc.QObject):
 
     error_occurred = qtc.Signal(str)
 
-    def __init__(self):
+    # (query, exchange id or "" while the text is still unsent, suggestions)
+    similar_answers_found = qtc.Signal(str, str, list)
+
+    def __init__(self, services: AppServices = None):
         super().__init__()
+        # One controller per conversation tab; the network backend, router,
+        # dataset writer and profiles live in the shared services object.
+        self.services = services or AppServices(parent=self)
+        self.owns_services = services is None
         self.conversation_id = str(uuid.uuid4())
-        self.user_profile = None
-        self.ai_profile = None
         self.worker_threads = []
-        
-        self.init_profiles()
-
-    def init_profiles(self):
-        user_worker = DatasetAgentWorker(entity_type='user')
-        user_worker.profile_ready.connect(self.set_user_profile)
-        user_worker.error_occurred.connect(
-            lambda e: print(f"Error getting user profile: {e}"))
-        user_worker.finished_signal.connect(self.cleanup_thread)
-        self.worker_threads.append(user_worker)
-        user_worker.start()
-        
-        ai_worker = DatasetAgentWorker(entity_type='ai')
-        ai_worker.profile_ready.connect(self.set_ai_profile)
-        ai_worker.error_occurred.connect(
-            lambda e: print(f"Error getting AI profile: {e}"))
-        ai_worker.finished_signal.connect(self.cleanup_thread)
-        self.worker_threads.append(ai_worker)
-        ai_worker.start()
-
-    def set_user_profile(self, profile: Profile):
-        self.user_profile = profile
-        print(f"User profile set: {profile.id}")
-
-    def set_ai_profile(self, profile: Profile):
-        self.ai_profile = profile
-        print(f"AI profile set: {profile.id}")
+        self.worker_exchanges = {}
+        self.pending_requests = {}
+        self.router = self.services.router
+        self.network_backend = self.services.network_backend
+        self.dataset_writer = self.services.dataset_writer
+        self.user_model = env_str("MYCHATBOT_MODEL")
+        self.turns = 0
+        self.pending_attachments = []
+        self.rendered_at = None
+
+        if self.network_backend is not None:
+            self.network_backend.response_received.connect(self.handle_async_response)
+            self.network_backend.error_occurred.connect(self.handle_async_error)
+            self.network_backend.finished_signal.connect(self.forget_request)
+
+    @property
+    def user_profile(self):
+        return self.services.user_profile
+
+    @property
+    def ai_profile(self):
+        return self.services.ai_profile
 
     def send_message(self, message_text: str):
         if not message_text or not self.user_profile:
             return
-        
-        self.display_user_message.emit(message_text)
+
+        sent_at = time.time()
+        exchange_id = str(uuid.uuid4())
+        self.display_user_message.emit(message_text, [])
+        self.find_similar(message_text, exchange_id)
+
+        model = self.router.choose(RoutingContext(
+            prompt=message_text,
+            attachments=self.pending_attachments,
+            depth=self.turns,
+            user_choice=self.user_model
+        ))
+        self.pending_attachments = []
+        self.turns += 1
             
         # Create message object
         message = Message(
             conversation_id=self.conversation_id,
             sender_id=self.user_profile.id,
-            content=message_text
+            content=message_text,
+            model=model
         )
         
         # Log the message
@@ -68,22 +86,96 @@ class MainController(qtc.QObject):
         
         self.show_loading.emit()
 
+        timing = RequestTiming(
+            exchange_id=exchange_id,
+            conversation_id=self.conversation_id,
+            model=model,
+            sent_at=sent_at,
+            prompt_chars=len(message_text)
+        )
+
         # Send to Mistral
-        self.send_to_mistral(message_text)
+        self.send_to_mistral(message_text, model, timing)
+
+    def find_similar(self, text: str, exchange_id: str = ""):
+        # Millisecond lookup against the local index; shown while the request
+        # is in flight, or as the user types so they can skip sending it.
+        self.similar_answers_found.emit(text, exchange_id, self.services.find_similar(text))
+
+    def use_past_answer(self, suggestion, prompt: str = None, exchange_id: str = None):
+        """Answer from a similar past exchange instead of waiting on the API.
+
+        With ``exchange_id`` the suggestion belongs to a sent message and only
+        that request is abandoned; if its reply already arrived nothing
+        happens. Otherwise ``prompt`` has not been sent yet, so it is
+        displayed and logged here.
+        """
+        if not self.ai_profile or not self.user_profile:
+            return
+
+        if exchange_id:
+            if not self.cancel_exchange(exchange_id):
+                return
+            self.hide_loading.emit()
+        elif prompt:
+            self.display_user_message.emit(prompt, [])
+            self.log_message(Message(
+                conversation_id=self.conversation_id,
+                sender_id=self.user_profile.id,
+                content=prompt
+            ))
+            self.pending_attachments = []
+            self.turns += 1
+        else:
+            return
+
+        self.display_ai_message.emit(suggestion.answer)
+        self.log_message(Message(
+            conversation_id=self.conversation_id,
+            sender_id=self.ai_profile.id,
+            content=suggestion.answer
+        ))
+
+    def set_model(self, model: str = None):
+        # None / empty string goes back to automatic routing.
+        self.user_model = model or None
+
+    def send_to_mistral(self, prompt: str, model: str, timing: RequestTiming = None):
+        if self.network_backend is not None:
+            request_id = self.network_backend.submit(prompt, model=model)
+            self.pending_requests[request_id] = timing
+            return
 
-    def send_to_mistral(self, prompt: str):
-        worker = MistralWorker(prompt)
-        worker.response_received.connect(self.handle_response)
+        worker = MistralWorker(prompt, model=model, tracker=self.router.tracker)
+        track_qobject(worker)
+        worker.response_received.connect(
+            lambda response, usage, marks: self.handle_response(response, usage, timing, marks))
         worker.error_occurred.connect(self.handle_error)
-        worker.finished_signal.connect(self.cleanup_thread)
+        worker.finished.connect(lambda w=worker: self.forget_worker(w))
         self.worker_threads.append(worker)
-        worker.start()
+        if timing is not None:
+            self.worker_exchanges[worker] = timing.exchange_id
+        self.services.start_worker(worker)
 
-    def handle_response(self, response: str):
+    def handle_response(self, response: str, usage: Usage = None,
+                        timing: RequestTiming = None, marks: dict = None):
         self.hide_loading.emit()
 
+        self.rendered_at = None
         self.display_ai_message.emit(response)
 
+        if timing is not None:
+            # Set through mark_rendered when the view builds the widget in the
+            # slot above; a background tab only queues the reply, so it stays
+            # None rather than recording a render that hasn't happened.
+            timing.rendered_at = self.rendered_at
+            timing.update(marks or {})
+            # timing.model stays the routed alias, which is what the router
+            # and latency report group by; the versioned name the API
+            # returns is stored on the message.
+            timing.response_chars = len(response)
+            self.dataset_writer.log_timing(timing)
+
         if not self.ai_profile:
             return
             
@@ -91,59 +183,116 @@ class MainController(qtc.QObject):
         message = Message(
             conversation_id=self.conversation_id,
             sender_id=self.ai_profile.id,
-            content=response
+            content=response,
+            usage=usage
         )
         
         # Log the message
         self.log_message(message)
 
+    def mark_rendered(self):
+        self.rendered_at = time.time()
+
     def handle_error(self, error: str):
         self.hide_loading.emit()
         self.error_occurred.emit(error)
 
+    def handle_async_response(self, request_id: str, response: str, usage: Usage,
+                              marks: dict):
+        if request_id in self.pending_requests:
+            self.handle_response(response, usage, self.pending_requests[request_id], marks)
+
+    def handle_async_error(self, request_id: str, error: str):
+        if request_id in self.pending_requests:
+            self.handle_error(error)
+
+    def forget_worker(self, worker):
+        if worker in self.worker_threads:
+            self.worker_threads.remove(worker)
+        self.worker_exchanges.pop(worker, None)
+
+    def forget_request(self, request_id: str):
+        self.pending_requests.pop(request_id, None)
+
     def log_message(self, message: Message):
-        worker = DatasetAgentWorker(message=message)
-        worker.logging_complete.connect(
-            lambda success: print("Message logged" if success else "Failed to log message"))
-        worker.error_occurred.connect(
-            lambda error: print(f"Error logging message: {error}"))
-        worker.finished_signal.connect(self.cleanup_thread)
-        self.worker_threads.append(worker)
-        worker.start()
-
-    # frontend/controllers/main_controller.py
-    def attach_file(self, file_path: str): 
-        try: 
-            filename = Path(file_path).name 
-            print(f"Attaching file: {filename} at path: {file_path}") # Debug print message = f"Attached file: {filename}" 
-            self.display_user_message.emit(message, attachments=[file_path])
-    
+        self.dataset_writer.log_message(message)
+
+    def attach_file(self, file_path: str):
+        try:
+            filename = Path(file_path).name
+            print(f"Attaching file: {filename} at path: {file_path}")  # Debug print
+            message = f"Attached file: {filename}"
+            self.display_user_message.emit(message, [file_path])
+            self.pending_attachments.append(file_path)
+
             if self.user_profile:
                 message_obj = Message(
-                conversation_id=self.conversation_id,
-                sender_id=self.user_profile.id,
-                content=message
-            )
-            
-            self.log_message(message_obj)
+                    conversation_id=self.conversation_id,
+                    sender_id=self.user_profile.id,
+                    content=message
+                )
+                self.log_message(message_obj)
         except Exception as e:
             self.error_occurred.emit(f"Error attaching file: {str(e)}")
 
-    def attach_image(self, image_path: str): 
-        try: 
-            filename = Path(image_path).name 
-            print(f"Attaching image: {filename} at path: {image_path}") # Debug print message = f"Attached image: {filename}" 
-            self.display_user_message.emit(message, attachments=[image_path])
-    
-        if self.user_profile:
-            message_obj = Message(
-                conversation_id=self.conversation_id,
-                sender_id=self.user_profile.id,
-                content=message
-            )
-            self.log_message(message_obj)
-    except Exception as e:
-        self.error_occurred.emit(f"Error attaching image: {str(e)}")
-
-    def cleanup_thread(self):
-        self.worker_threads = [t for t in self.worker_threads if t.isRunning()]
\ No newline at end of file
+    def attach_image(self, image_path: str):
+        try:
+            filename = Path(image_path).name
+            print(f"Attaching image: {filename} at path: {image_path}")  # Debug print
+            message = f"Attached image: {filename}"
+            self.display_user_message.emit(message, [image_path])
+            self.pending_attachments.append(image_path)
+
+            if self.user_profile:
+                message_obj = Message(
+                    conversation_id=self.conversation_id,
+                    sender_id=self.user_profile.id,
+                    content=message
+                )
+                self.log_message(message_obj)
+        except Exception as e:
+            self.error_occurred.emit(f"Error attaching image: {str(e)}")
+
+    def cancel_worker(self, worker):
+        self.services.cancel_worker(worker)
+        worker.response_received.disconnect()
+        worker.error_occurred.disconnect()
+
+    def cancel_exchange(self, exchange_id: str) -> bool:
+        """Abandon the request for one exchange; False if it is no longer pending."""
+        request_ids = [request_id for request_id, timing in self.pending_requests.items()
+                       if timing is not None and timing.exchange_id == exchange_id]
+        for request_id in request_ids:
+            self.network_backend.cancel(request_id)
+            del self.pending_requests[request_id]
+
+        workers = [worker for worker, worker_exchange in self.worker_exchanges.items()
+                   if worker_exchange == exchange_id]
+        for worker in workers:
+            self.cancel_worker(worker)
+            self.forget_worker(worker)
+        return bool(request_ids or workers)
+
+    def cancel_pending(self):
+        # Replies that still arrive are ignored: their ids are no longer
+        # pending and the thread workers are disconnected.
+        if self.network_backend is not None:
+            for request_id in list(self.pending_requests):
+                self.network_backend.cancel(request_id)
+        for worker in self.worker_threads:
+            self.cancel_worker(worker)
+        self.worker_threads = []
+        self.worker_exchanges.clear()
+        self.pending_requests.clear()
+
+    def close(self):
+        # Closing a tab drops its queued and in-flight requests.
+        self.cancel_pending()
+        if self.network_backend is not None:
+            self.network_backend.response_received.disconnect(self.handle_async_response)
+            self.network_backend.error_occurred.disconnect(self.handle_async_error)
+            self.network_backend.finished_signal.disconnect(self.forget_request)
+
+    def shutdown(self):
+        if self.owns_services:
+            self.services.shutdown()
\ No newline at end of file
@@ -0,0 +1,181 @@
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+import weakref
+from collections import Counter
+from typing import Callable, Dict, Optional
+from PySide6 import QtCore as qtc
+from PySide6 import QtWidgets as qtw
+from backend.agents import dataset_agent
+from backend.config import data_dir, env_bool, env_float, env_str
+
+logger = logging.getLogger("mychatbot.diagnostics")
+
+# Frames kept per allocation; deeper stacks make snapshots slower and larger.
+TRACEMALLOC_FRAMES = 10
+TOP_GROWTH = 10
+TOP_CLASSES = 15
+
+# Parentless QObjects (worker threads) are not reachable from the widget
+# tree, so they register here to be counted while they are alive.
+_tracked_qobjects: "weakref.WeakSet" = weakref.WeakSet()
+
+
+def track_qobject(obj: qtc.QObject):
+    _tracked_qobjects.add(obj)
+
+
+def diagnostics_enabled() -> bool:
+    return env_bool("MYCHATBOT_DIAGNOSTICS")
+
+
+def _rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _os_threads() -> Optional[int]:
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("Threads:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+class DiagnosticsSampler(qtc.QObject):
+    """Samples memory, QObject, thread and SQLite connection counts.
+
+    Each sample is diffed against the previous one (tracemalloc by source
+    line, QObjects by class) so steady growth points at its source. Samples
+    are emitted through ``sample_ready`` and appended as JSON lines to the
+    diagnostics log.
+    """
+
+    sample_ready = qtc.Signal(dict)
+
+    def __init__(self, interval: float = 60.0, log_path: Optional[str] = None, parent=None):
+        super().__init__(parent)
+        self.log_path = log_path or os.path.join(data_dir(), "diagnostics.log")
+        self.sources: Dict[str, Callable[[], dict]] = {}
+        self._previous_snapshot = None
+        self._previous_classes: Counter = Counter()
+        self.last_sample: Optional[dict] = None
+
+        self._timer = qtc.QTimer(self)
+        self._timer.setInterval(int(interval * 1000))
+        self._timer.timeout.connect(self.sample)
+
+    @classmethod
+    def from_env(cls, parent=None) -> "DiagnosticsSampler":
+        return cls(
+            interval=env_float("MYCHATBOT_DIAGNOSTICS_INTERVAL", 60.0),
+            log_path=env_str("MYCHATBOT_DIAGNOSTICS_LOG"),
+            parent=parent
+        )
+
+    def add_source(self, name: str, source: Callable[[], dict]):
+        self.sources[name] = source
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+        if not logger.handlers:
+            handler = logging.FileHandler(self.log_path, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+        self.sample()
+        self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+        tracemalloc.stop()
+
+    def _memory_growth(self) -> list:
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ])
+        growth = []
+        if self._previous_snapshot is not None:
+            for stat in snapshot.compare_to(self._previous_snapshot, "lineno")[:TOP_GROWTH]:
+                if stat.size_diff <= 0:
+                    continue
+                frame = stat.traceback[0]
+                growth.append({
+                    "source": f"{frame.filename}:{frame.lineno}",
+                    "size_diff_kib": round(stat.size_diff / 1024, 1),
+                    "count_diff": stat.count_diff,
+                    "size_kib": round(stat.size / 1024, 1),
+                })
+        self._previous_snapshot = snapshot
+        return growth
+
+    def _qobject_counts(self) -> Counter:
+        app = qtw.QApplication.instance()
+        counts: Counter = Counter()
+        if app is None:
+            return counts
+
+        roots = [app] + list(app.topLevelWidgets()) + list(_tracked_qobjects)
+        seen = set()
+        for root in roots:
+            for obj in [root] + root.findChildren(qtc.QObject):
+                key = id(obj)
+                if key in seen:
+                    continue
+                seen.add(key)
+                counts[obj.metaObject().className()] += 1
+        return counts
+
+    def sample(self) -> dict:
+        started = time.perf_counter()
+        current, peak = tracemalloc.get_traced_memory()
+        classes = self._qobject_counts()
+        class_growth = {name: count - self._previous_classes.get(name, 0)
+                        for name, count in classes.items()
+                        if count != self._previous_classes.get(name, 0)}
+        self._previous_classes = classes
+
+        result = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "rss_mb": _rss_mb(),
+            "traced_mb": round(current / (1024 * 1024), 2),
+            "traced_peak_mb": round(peak / (1024 * 1024), 2),
+            "memory_growth": self._memory_growth(),
+            "qobjects_total": sum(classes.values()),
+            "qobjects": dict(classes.most_common(TOP_CLASSES)),
+            "qobject_growth": dict(sorted(class_growth.items(), key=lambda kv: -abs(kv[1]))[:TOP_CLASSES]),
+            "threads": {
+                "python": threading.active_count(),
+                "os": _os_threads(),
+                "qt_pool_active": qtc.QThreadPool.globalInstance().activeThreadCount(),
+            },
+            "sqlite_connections": dict(dataset_agent.connection_stats),
+        }
+        for name, source in self.sources.items():
+            try:
+                result[name] = source()
+            except Exception as e:
+                result[name] = {"error": str(e)}
+        result["sample_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        self.last_sample = result
+        logger.info(json.dumps(result))
+        self.sample_ready.emit(result)
+        return result
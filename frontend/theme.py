@@ -0,0 +1,166 @@
+from PySide6 import QtWidgets as qtw
+
+BACKGROUND = "rgb(0,22,45)"
+SURFACE = "rgb(0,38,80)"
+BORDER = "rgb(33,84,141)"
+ACCENT = "rgb(94,147,207)"
+TEXT = "rgb(177,203,231)"
+
+# Code block colours, used as inline styles because QTextDocument HTML does
+# not see the application stylesheet.
+CODE_BACKGROUND = "#001a35"
+CODE_TEXT = "#d4e2f1"
+CODE_KEYWORD = "#5e93cf"
+CODE_STRING = "#98c379"
+CODE_COMMENT = "#6a7f96"
+CODE_NUMBER = "#d19a66"
+
+# One application-wide sheet: widgets opt into rules through their object name
+# and the "role" dynamic property ("user" / "ai") instead of carrying their
+# own setStyleSheet() calls, so Qt parses the QSS once.
+STYLESHEET = f"""
+QMainWindow {{
+    background-color: {BACKGROUND};
+}}
+QScrollArea {{
+    border: none;
+    background-color: {SURFACE};
+}}
+QScrollArea#chatScrollArea {{
+    border-radius: 8px;
+    border: 1px solid {BORDER};
+}}
+QWidget#chatContainer {{
+    background-color: {SURFACE};
+}}
+QTextEdit, QTextEdit:focus {{
+    border: 1px solid {BORDER};
+    border-radius: 8px;
+    padding: 8px;
+    background-color: {SURFACE};
+    color: {TEXT};
+    font-size: 14px;
+    selection-background-color: {BORDER};
+    selection-color: {TEXT};
+}}
+QTextEdit#messageInput {{
+    border-radius: 12px;
+    padding: 12px;
+}}
+QTextEdit#messageInput:focus {{
+    border: 2px solid {ACCENT};
+}}
+QTextEdit#messageBody {{
+    border-radius: 12px;
+    padding: 12px;
+    margin-bottom: 8px;
+}}
+QTextEdit#messageBody[role="ai"] {{
+    background-color: {BACKGROUND};
+}}
+QLabel#senderLabel {{
+    font-weight: bold;
+    font-size: 12px;
+    margin-bottom: 2px;
+    color: {ACCENT};
+}}
+QLabel#senderLabel[role="user"] {{
+    color: {TEXT};
+}}
+QLabel#loadingLabel {{
+    color: {ACCENT};
+    font-style: italic;
+    font-size: 14px;
+}}
+QFrame#suggestionPanel {{
+    border: 1px solid {BORDER};
+    border-radius: 8px;
+    background-color: {BACKGROUND};
+}}
+QLabel#suggestionTitle {{
+    color: {ACCENT};
+    font-weight: bold;
+    font-size: 12px;
+}}
+QLabel#suggestionText {{
+    color: {TEXT};
+    font-size: 12px;
+}}
+QPushButton {{
+    background-color: {BORDER};
+    color: {TEXT};
+    border: none;
+    border-radius: 6px;
+    padding: 8px 16px;
+    font-size: 14px;
+}}
+QPushButton:hover {{
+    background-color: {ACCENT};
+}}
+QPushButton:pressed {{
+    background-color: {BORDER};
+}}
+QPushButton#messageAction {{
+    padding: 4px 8px;
+    border: 1px solid {BORDER};
+    border-radius: 4px;
+    background-color: {SURFACE};
+    font-size: 12px;
+}}
+QPushButton#messageAction:hover {{
+    background-color: {ACCENT};
+}}
+QPushButton[flat="true"] {{
+    border: 1px solid {BORDER};
+    border-radius: 4px;
+    padding: 2px;
+    background-color: rgba(0,38,80,0.7);
+}}
+QPushButton[flat="true"]:hover {{
+    background-color: rgba(94,147,207,0.7);
+}}
+QComboBox {{
+    background-color: {SURFACE};
+    color: {TEXT};
+    border: 1px solid {BORDER};
+    border-radius: 6px;
+    padding: 6px 10px;
+    font-size: 14px;
+}}
+QComboBox QAbstractItemView {{
+    background-color: {SURFACE};
+    color: {TEXT};
+    selection-background-color: {ACCENT};
+}}
+QMenu {{
+    background-color: {SURFACE};
+    border: 1px solid {BORDER};
+    color: {TEXT};
+}}
+QMenu::item:selected {{
+    background-color: {ACCENT};
+}}
+QMessageBox {{
+    background-color: {SURFACE};
+}}
+QMessageBox QLabel {{
+    color: {TEXT};
+}}
+QStatusBar {{
+    background-color: {SURFACE};
+    color: {TEXT};
+    font-size: 12px;
+    padding: 4px;
+    border-top: 1px solid {BORDER};
+}}
+"""
+
+
+def apply(app: qtw.QApplication = None):
+    app = app or qtw.QApplication.instance()
+    if app is not None and app.styleSheet() != STYLESHEET:
+        app.setStyleSheet(STYLESHEET)
+
+
+def set_role(widget: qtw.QWidget, is_user: bool):
+    widget.setProperty("role", "user" if is_user else "ai")
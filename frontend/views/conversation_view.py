@@ -0,0 +1,142 @@
+from PySide6 import QtWidgets as qtw
+from PySide6 import QtCore as qtc
+from ..components.loading_widget import LoadingWidget
+from ..components.suggestion_panel import SuggestionPanel
+from ..components.transcript import TranscriptManager
+from backend.config import env_float
+
+class ConversationView(qtw.QWidget):
+    history_loaded = qtc.Signal(int)
+    unread_changed = qtc.Signal(bool)
+    suggestion_chosen = qtc.Signal(str, str, object)
+    # An AI message widget was built (not just queued for a background tab).
+    message_rendered = qtc.Signal()
+
+    def __init__(self, controller=None, parent=None):
+        super().__init__(parent)
+        self.controller = controller
+        self.loading_widget = None
+        # Messages that arrive while this tab is in the background are kept
+        # here and replayed through the bulk path when it is shown.
+        self.deferred_messages = []
+        self.has_unread = False
+        self.active = True
+
+        self.setup_ui()
+        if controller is not None:
+            self.bind_controller(controller)
+
+    def setup_ui(self):
+        layout = qtw.QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.setLayout(layout)
+
+        self.scroll_area = qtw.QScrollArea()
+        self.scroll_area.setWidgetResizable(True)
+        self.scroll_area.setObjectName("chatScrollArea")
+        
+        self.chat_container = qtw.QWidget()
+        self.chat_container.setObjectName("chatContainer")
+        self.chat_layout = qtw.QVBoxLayout()
+        self.chat_layout.setAlignment(qtc.Qt.AlignTop)
+        self.chat_layout.setContentsMargins(10, 10, 10, 10)
+        self.chat_layout.setSpacing(15)
+        self.chat_container.setLayout(self.chat_layout)
+        
+        self.scroll_area.setWidget(self.chat_container)
+        layout.addWidget(self.scroll_area)
+
+        self.suggestion_panel = SuggestionPanel()
+        self.suggestion_panel.answer_chosen.connect(self.suggestion_chosen)
+        layout.addWidget(self.suggestion_panel)
+
+        self.transcript = TranscriptManager(
+            self.scroll_area,
+            self.chat_layout,
+            margin_screens=env_float("MYCHATBOT_TRANSCRIPT_MARGIN_SCREENS", 2.0),
+            parent=self
+        )
+        self.transcript.bulk_finished.connect(self.history_loaded)
+
+    def bind_controller(self, controller):
+        controller.display_user_message.connect(
+            lambda msg, attachments=None: self.add_message(
+                msg, is_user=True, attachments=attachments
+            )
+        )
+        controller.display_ai_message.connect(
+            lambda msg: self.add_message(msg, is_user=False))
+        controller.display_ai_message.connect(self.suggestion_panel.clear)
+        controller.similar_answers_found.connect(self.suggestion_panel.show_suggestions)
+        controller.show_loading.connect(self.show_loading_indicator)
+        controller.hide_loading.connect(self.hide_loading_indicator)
+        controller.error_occurred.connect(
+            lambda error: self.add_message(error, is_user=False))
+        self.message_rendered.connect(controller.mark_rendered)
+
+    def set_active(self, active: bool):
+        self.active = active
+        if not active:
+            return
+        if self.deferred_messages:
+            deferred, self.deferred_messages = self.deferred_messages, []
+            self.transcript.extend(deferred)
+        if self.has_unread:
+            self.has_unread = False
+            self.unread_changed.emit(False)
+
+    def is_in_background(self) -> bool:
+        return not self.active
+
+    def add_message(self, message: str, is_user: bool, attachments = None):
+        if self.is_in_background():
+            self.deferred_messages.append((message, is_user, attachments))
+            if not is_user and not self.has_unread:
+                self.has_unread = True
+                self.unread_changed.emit(True)
+            return None
+
+        message_widget = self.transcript.append(message, is_user, attachments)
+
+        # Parented to the widget so it is counted by diagnostics, and deleted
+        # once it has run instead of living as long as the message.
+        animation = qtc.QPropertyAnimation(message_widget, b"windowOpacity", message_widget)
+        animation.setDuration(300)
+        animation.setStartValue(0)
+        animation.setEndValue(1)
+        animation.start(qtc.QAbstractAnimation.DeleteWhenStopped)
+
+        qtc.QTimer.singleShot(100, self.scroll_to_bottom)
+        if not is_user:
+            self.message_rendered.emit()
+        return message_widget
+
+    def add_messages(self, messages, time_slice_ms: int = 12):
+        # Bulk path for history replay and imports: no animations and a single
+        # layout/scroll once everything is in; history_loaded fires at the end.
+        if self.is_in_background():
+            self.deferred_messages.extend(tuple(item) for item in messages)
+            return
+        self.transcript.extend(messages, time_slice_ms=time_slice_ms)
+
+    def transcript_stats(self) -> dict:
+        stats = self.transcript.stats()
+        stats["deferred"] = len(self.deferred_messages)
+        return stats
+
+    def show_loading_indicator(self):
+        if self.loading_widget is None:
+            self.loading_widget = LoadingWidget()
+            self.chat_layout.addWidget(self.loading_widget)
+            qtc.QTimer.singleShot(100, self.scroll_to_bottom)
+
+    def hide_loading_indicator(self):
+        if self.loading_widget:
+            self.loading_widget.hide()
+            self.loading_widget.deleteLater()
+            self.loading_widget = None
+
+    def scroll_to_bottom(self):
+        self.scroll_area.verticalScrollBar().setValue(
+            self.scroll_area.verticalScrollBar().maximum()
+        )
@@ -1,19 +1,27 @@
 from PySide6 import QtWidgets as qtw
 from PySide6 import QtCore as qtc
-from ..components.chat_message import ChatMessageWidget
-from ..components.loading_widget import LoadingWidget
+from .conversation_view import ConversationView
+from .. import theme
+from backend.agents.model_router import LARGE_MODEL, SMALL_MODEL
+from backend.config import env_bool, env_str
 
 class MainWindow(qtw.QMainWindow):
-    def __init__(self, controller):
+    history_loaded = qtc.Signal(int)
+
+    MIN_SUGGESTION_CHARS = 12
+
+    def __init__(self, controller, controller_factory=None, services=None):
         super().__init__()
         self.controller = controller
+        self.controller_factory = controller_factory
+        self.services = services
         self.setWindowTitle("Mistral AI Chat")
         self.setGeometry(100, 100, 800, 600)
-        self.worker_threads = []
-        self.loading_widget = None
+        self.conversation_count = 0
         
         self.setup_ui()
         self.setup_styles()
+        self.add_conversation(controller)
         
     def setup_ui(self):
         central_widget = qtw.QWidget()
@@ -24,23 +32,20 @@ class MainWindow(qtw.QMainWindow):
         main_layout.setSpacing(10)
         central_widget.setLayout(main_layout)
 
-        self.scroll_area = qtw.QScrollArea()
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setStyleSheet("""
-            background-color: rgb(0,38,80);
-            border-radius: 8px;
-            border: 1px solid rgb(33,84,141);
-        """)
-        
-        self.chat_container = qtw.QWidget()
-        self.chat_layout = qtw.QVBoxLayout()
-        self.chat_layout.setAlignment(qtc.Qt.AlignTop)
-        self.chat_layout.setContentsMargins(10, 10, 10, 10)
-        self.chat_layout.setSpacing(15)
-        self.chat_container.setLayout(self.chat_layout)
-        
-        self.scroll_area.setWidget(self.chat_container)
-        main_layout.addWidget(self.scroll_area)
+        self.tabs = qtw.QTabWidget()
+        self.tabs.setDocumentMode(True)
+        self.tabs.setTabsClosable(True)
+        self.tabs.setMovable(True)
+        self.tabs.tabCloseRequested.connect(self.close_conversation)
+        self.tabs.currentChanged.connect(self.on_tab_changed)
+
+        self.new_tab_button = qtw.QToolButton()
+        self.new_tab_button.setText("+")
+        self.new_tab_button.setToolTip("New conversation")
+        self.new_tab_button.setEnabled(self.controller_factory is not None)
+        self.new_tab_button.clicked.connect(lambda: self.add_conversation())
+        self.tabs.setCornerWidget(self.new_tab_button, qtc.Qt.TopRightCorner)
+        main_layout.addWidget(self.tabs)
 
         input_layout = qtw.QVBoxLayout()
         input_layout.setContentsMargins(0, 10, 0, 0)
@@ -48,19 +53,7 @@ class MainWindow(qtw.QMainWindow):
         self.input_text = qtw.QTextEdit()
         self.input_text.setPlaceholderText("Type your message here...")
         self.input_text.setMaximumHeight(100)
-        self.input_text.setStyleSheet("""
-            QTextEdit {
-                border: 1px solid rgb(33,84,141);
-                border-radius: 12px;
-                padding: 12px;
-                font-size: 14px;
-                background-color: rgb(0,38,80);
-                color: rgb(177,203,231);
-            }
-            QTextEdit:focus {
-                border: 2px solid rgb(94,147,207);
-            }
-        """)
+        self.input_text.setObjectName("messageInput")
         input_layout.addWidget(self.input_text)
 
         button_layout = qtw.QHBoxLayout()
@@ -75,86 +68,137 @@ class MainWindow(qtw.QMainWindow):
         self.image_button = qtw.QPushButton("Attach Image")
         button_layout.addWidget(self.image_button)
 
+        self.model_selector = qtw.QComboBox()
+        self.model_selector.addItem("Auto model", "")
+        for model in dict.fromkeys([
+            env_str("MYCHATBOT_SMALL_MODEL", SMALL_MODEL),
+            env_str("MYCHATBOT_LARGE_MODEL", LARGE_MODEL),
+        ]):
+            self.model_selector.addItem(model, model)
+        pinned = self.model_selector.findData(env_str("MYCHATBOT_MODEL", ""))
+        self.model_selector.setCurrentIndex(max(pinned, 0))
+        button_layout.addWidget(self.model_selector)
+
         input_layout.addLayout(button_layout)
         main_layout.addLayout(input_layout)
 
-        self.statusBar().setStyleSheet("""
-            QStatusBar {
-                background-color: rgb(0,38,80);
-                color: rgb(177,203,231);
-                font-size: 12px;
-                padding: 4px;
-                border-top: 1px solid rgb(33,84,141);
-            }
-        """)
+        if env_bool("MYCHATBOT_TRANSCRIPT_STATS"):
+            self.transcript_stats_label = qtw.QLabel()
+            self.statusBar().addPermanentWidget(self.transcript_stats_label)
 
         self.send_button.clicked.connect(self.on_send_clicked)
         self.file_button.clicked.connect(self.on_attach_file)
         self.image_button.clicked.connect(self.on_attach_image)
+        self.model_selector.currentIndexChanged.connect(self.on_model_selected)
+
+        # Similar-answer lookups run once typing pauses.
+        self.suggestion_timer = qtc.QTimer(self)
+        self.suggestion_timer.setSingleShot(True)
+        self.suggestion_timer.setInterval(300)
+        self.suggestion_timer.timeout.connect(self.on_suggestion_timeout)
+        self.input_text.textChanged.connect(self.suggestion_timer.start)
 
     def setup_styles(self):
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: rgb(0,22,45);
-            }
-            QScrollArea {
-                border: none;
-                background-color: rgb(0,38,80);
-            }
-            QTextEdit, QTextEdit:focus {
-                border: 1px solid rgb(33,84,141);
-                border-radius: 8px;
-                padding: 8px;
-                background-color: rgb(0,38,80);
-                color: rgb(177,203,231);
-                font-size: 14px;
-                selection-background-color: rgb(33,84,141);
-                selection-color: rgb(177,203,231);
-            }
-            QPushButton {
-                background-color: rgb(33,84,141);
-                color: rgb(177,203,231);
-                border: none;
-                border-radius: 6px;
-                padding: 8px 16px;
-                font-size: 14px;
-            }
-            QPushButton:hover {
-                background-color: rgb(94,147,207);
-            }
-            QPushButton:pressed {
-                background-color: rgb(33,84,141);
-            }
-            QMenu {
-                background-color: rgb(0,38,80);
-                border: 1px solid rgb(33,84,141);
-                color: rgb(177,203,231);
-            }
-            QMenu::item:selected {
-                background-color: rgb(94,147,207);
-            }
-            QMessageBox {
-                background-color: rgb(0,38,80);
-            }
-            QMessageBox QLabel {
-                color: rgb(177,203,231);
-            }
-            QPushButton[flat="true"] {
-                border: 1px solid rgb(33,84,141);
-                border-radius: 4px;
-                padding: 2px;
-                background-color: rgba(0,38,80,0.7);
-            }
-            QPushButton[flat="true"]:hover {
-                background-color: rgba(94,147,207,0.7);
-            }
-        """)
+        theme.apply()
+
+    def current_view(self) -> ConversationView:
+        return self.tabs.currentWidget()
+
+    def conversation_views(self):
+        return [self.tabs.widget(index) for index in range(self.tabs.count())]
+
+    @property
+    def transcript(self):
+        return self.current_view().transcript
+
+    @property
+    def scroll_area(self):
+        return self.current_view().scroll_area
+
+    def add_conversation(self, controller=None) -> ConversationView:
+        if controller is None and self.controller_factory is not None:
+            controller = self.controller_factory()
+
+        self.conversation_count += 1
+        view = ConversationView(controller)
+        view.history_loaded.connect(
+            lambda count, v=view: v is self.current_view() and self.history_loaded.emit(count))
+        view.unread_changed.connect(
+            lambda unread, v=view: self.mark_unread(v, unread))
+        view.suggestion_chosen.connect(
+            lambda query, exchange_id, suggestion, v=view:
+                self.on_suggestion_chosen(v, query, exchange_id, suggestion))
+        if hasattr(self, "transcript_stats_label"):
+            view.transcript.stats_changed.connect(
+                lambda _: self.update_transcript_stats_label(self.transcript_stats()))
+
+        index = self.tabs.addTab(view, f"Chat {self.conversation_count}")
+        self.tabs.setCurrentIndex(index)
+        return view
+
+    def close_conversation(self, index: int):
+        if self.tabs.count() == 1:
+            return
+        view = self.tabs.widget(index)
+        self.tabs.removeTab(index)
+        if view.controller is not None:
+            view.controller.close()
+            view.controller.deleteLater()
+        view.deleteLater()
+
+    def on_tab_changed(self, index: int):
+        # Hidden tabs only queue their messages; the one being shown replays
+        # its backlog through the bulk path, so switching never builds more
+        # than the visible window of widgets.
+        current = self.tabs.widget(index)
+        for view in self.conversation_views():
+            view.set_active(view is current)
+        if current is None:
+            return
+
+        self.controller = current.controller
+        if self.controller is not None:
+            self.model_selector.blockSignals(True)
+            selected = self.model_selector.findData(self.controller.user_model or "")
+            self.model_selector.setCurrentIndex(max(selected, 0))
+            self.model_selector.blockSignals(False)
+
+    def mark_unread(self, view: ConversationView, unread: bool):
+        index = self.tabs.indexOf(view)
+        if index < 0:
+            return
+        title = self.tabs.tabText(index).removeprefix("● ")
+        self.tabs.setTabText(index, f"● {title}" if unread else title)
 
     def on_send_clicked(self):
         message = self.input_text.toPlainText().strip()
         if message:
             self.controller.send_message(message)
             self.input_text.clear()
+            self.suggestion_timer.stop()
+
+    def on_suggestion_timeout(self):
+        message = self.input_text.toPlainText().strip()
+        # Short or cleared input (e.g. right after sending) keeps whatever
+        # the panel shows, so in-flight suggestions stay up.
+        if self.controller is None or len(message) < self.MIN_SUGGESTION_CHARS:
+            return
+        self.controller.find_similar(message)
+
+    def on_suggestion_chosen(self, view: ConversationView, query: str, exchange_id: str,
+                             suggestion):
+        if view.controller is None:
+            return
+        if exchange_id:
+            view.controller.use_past_answer(suggestion, exchange_id=exchange_id)
+            return
+        # Found while typing: use the past answer instead of sending.
+        view.controller.use_past_answer(suggestion, prompt=query)
+        if query == self.input_text.toPlainText().strip():
+            self.input_text.clear()
+
+    def on_model_selected(self, index: int):
+        self.controller.set_model(self.model_selector.itemData(index))
 
     def on_attach_file(self):
         file_path, _ = qtw.QFileDialog.getOpenFileName(
@@ -172,35 +216,34 @@ class MainWindow(qtw.QMainWindow):
         if image_path:
             self.controller.attach_image(image_path)
 
-    def add_message(self, message: str, is_user: bool, attachements = None):
-        message_widget = ChatMessageWidget(message, is_user, attachments)
-        self.chat_layout.addWidget(message_widget)
-        
-        animation = qtc.QPropertyAnimation(message_widget, b"windowOpacity")
-        animation.setDuration(300)
-        animation.setStartValue(0)
-        animation.setEndValue(1)
-        animation.start()
-        
-        qtc.QTimer.singleShot(100, self.scroll_to_bottom)
-        return message_widget
+    def add_message(self, message: str, is_user: bool, attachments = None):
+        return self.current_view().add_message(message, is_user, attachments)
+
+    def add_messages(self, messages, time_slice_ms: int = 12):
+        self.current_view().add_messages(messages, time_slice_ms=time_slice_ms)
+
+    def transcript_stats(self) -> dict:
+        totals = {}
+        for view in self.conversation_views():
+            for key, value in view.transcript_stats().items():
+                totals[key] = totals.get(key, 0) + value
+        totals["tabs"] = self.tabs.count()
+        return totals
+
+    def update_transcript_stats_label(self, stats: dict):
+        self.transcript_stats_label.setText(
+            f"{stats['live_widgets']}/{stats['messages']} widgets, "
+            f"~{stats['estimated_bytes'] / (1024 * 1024):.1f} MiB"
+        )
 
     def show_loading_indicator(self):
-        if self.loading_widget is None:
-            self.loading_widget = LoadingWidget()
-            self.chat_layout.addWidget(self.loading_widget)
-            qtc.QTimer.singleShot(100, self.scroll_to_bottom)
+        self.current_view().show_loading_indicator()
 
     def hide_loading_indicator(self):
-        if self.loading_widget:
-            self.loading_widget.hide()
-            self.loading_widget.deleteLater()
-            self.loading_widget = None
+        self.current_view().hide_loading_indicator()
 
     def scroll_to_bottom(self):
-        self.scroll_area.verticalScrollBar().setValue(
-            self.scroll_area.verticalScrollBar().maximum()
-        )
+        self.current_view().scroll_to_bottom()
 
     def clear_input(self):
         self.input_text.clear()
@@ -209,8 +252,11 @@ class MainWindow(qtw.QMainWindow):
         self.statusBar().showMessage(message, timeout)
 
     def closeEvent(self, event):
-        for thread in self.worker_threads:
-            if thread.isRunning():
-                thread.quit()
-                thread.wait()
+        for view in self.conversation_views():
+            if view.controller is not None:
+                view.controller.close()
+        # Wait for the real request workers and drain the dataset writer
+        # before the window goes away.
+        if self.services is not None:
+            self.services.shutdown()
         event.accept()
\ No newline at end of file
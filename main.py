@@ -1,7 +1,12 @@
 from PySide6 import QtWidgets as qtw
+from PySide6 import QtCore as qtc
 from dotenv import load_dotenv
 from frontend.views.main_window import MainWindow
 from frontend.controllers.main_controller import MainController
+from frontend.controllers.app_services import AppServices
+from frontend import theme
+from frontend.diagnostics import DiagnosticsSampler, diagnostics_enabled
+from frontend.components.diagnostics_panel import DiagnosticsPanel
 from pathlib import Path
 
 env_path = Path(__file__).parent / '.env'
@@ -10,22 +15,31 @@ load_dotenv(env_path)
 
 def main():
     app = qtw.QApplication([])
-
-    controller = MainController()
-    window = MainWindow(controller)
-
-    # Connect controller signals to view methods
-    controller.display_user_message.connect(
-        lambda msg, attachments=None: window.add_message(
-            msg, is_user=True, attachments=attachments
-        )
-    )
-    controller.display_ai_message.connect(
-        lambda msg: window.add_message(msg, is_user=False))
-    controller.show_loading.connect(window.show_loading_indicator)
-    controller.hide_loading.connect(window.hide_loading_indicator)
-    controller.error_occurred.connect(
-        lambda error: window.add_message(error, is_user=False))
+    theme.apply(app)
+
+    services = AppServices(parent=app)
+    controller = MainController(services)
+    window = MainWindow(controller, controller_factory=lambda: MainController(services),
+                        services=services)
+
+    app.aboutToQuit.connect(services.shutdown)
+
+    if diagnostics_enabled():
+        sampler = DiagnosticsSampler.from_env(parent=app)
+        sampler.add_source("transcript", window.transcript_stats)
+        sampler.add_source("controller", lambda: {
+            "worker_threads": len(services.worker_threads),
+            "queued_workers": len(services.queued_workers),
+            "in_flight": services.in_flight(),
+            "pending_requests": sum(
+                len(view.controller.pending_requests)
+                for view in window.conversation_views()
+                if view.controller is not None
+            ),
+        })
+        window.addDockWidget(qtc.Qt.RightDockWidgetArea, DiagnosticsPanel(sampler, window))
+        sampler.start()
+        app.aboutToQuit.connect(sampler.stop)
 
     window.show()
     app.exec()